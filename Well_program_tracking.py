@@ -1,26 +1,30 @@
 import streamlit as st
 import pandas as pd
-import os
+import math
+from io import BytesIO
 from datetime import datetime, timedelta
-import plotly.express as px
-import plotly.graph_objects as go
-
-# File untuk menyimpan data
-DATA_FILE = "data/well_program_data.xlsx"
-os.makedirs("data", exist_ok=True)
-
-# Kolom yang diharapkan
-REQUIRED_COLUMNS = [
-    "No", "Well Name", "Well Program Name", "Program No", "Creation Date", "Due Date",
-    "Status", "Doc Initiator", "Approval 1", "Approval 2", "Approval 3", "Approval 4", "Remarks"
-]
-
-# Opsi valid untuk dropdown
-VALID_INITIATORS = ["DHARMAWAN RAHARJO", "R.AULIA MUHAMMAD RIZKY", "HIBAN"]
-VALID_APPROVAL1_2 = ["KRISTIANTO WIBOWO", "YULIANTO AGUS", ""]
-VALID_APPROVAL3 = ["BUDI RIVAI WIJAYA", ""]
-VALID_APPROVAL4 = ["PE TEAM", ""]
-VALID_STATUSES = ["COMPLETED", "INPROGRESS"]
+
+from well_program_core import (
+    APPROVAL_FILTER_OPTIONS, APPROVED_VALUES, DATE_COLUMNS, KEY_COLUMN, REMINDER_APPROACHING_DAYS, REMINDER_COLUMNS,
+    REPORT_COLUMNS, REQUIRED_COLUMNS, STATUS_FILTER_OPTIONS, STORAGE_BACKEND, STORED_COLUMNS, VALID_APPROVAL1_2,
+    VALID_APPROVAL3, VALID_APPROVAL4, VALID_INITIATORS, VERSION_COLUMN, KeyIndex, build_filter_masks, build_reminder_table,
+    approval_timestamps, combine_filter_masks, derive_status, format_for_display, open_storage, page_positions, parse_dates,
+    sort_positions, validate_upload
+)
+from ingest import INGEST_CHUNK_SIZE, is_csv, iter_upload_chunks, read_upload_header
+from aggregates import AggregateStore
+from storage import ConflictError, JournaledStorage, apply_schema, export_excel
+from profiling import PROFILE_DEFAULT, RerunProfiler
+from reminders import REMINDER_SCHEDULER, ReminderScheduler, ReminderStore
+from sla import compute_sla
+from charts import FIGURE_BUILDERS, chart_key, month_labels
+
+# Opsi paginasi tabel Report Statistik
+PAGE_SIZE_OPTIONS = [25, 50, 100, 500]
+# Jumlah maksimum pesan kesalahan yang ditampilkan pada mode streaming
+MAX_DISPLAYED_ERRORS = 200
+# Bagian grafik Report Statistik (hanya yang dipilih yang dirender)
+CHART_SECTIONS = ["Statistik Status", "Per Bulan", "SLA Approval"]
 
 # CSS untuk background gradasi
 st.markdown("""
@@ -54,92 +58,217 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Inisialisasi data jika belum ada atau perbarui struktur
-if not os.path.exists(DATA_FILE):
-    df_init = pd.DataFrame(columns=REQUIRED_COLUMNS)
-    df_init.to_excel(DATA_FILE, index=False)
-else:
-    # Periksa apakah kolom Due Date ada di file Excel yang sudah ada
-    df_temp = pd.read_excel(DATA_FILE)
-    if "Due Date" not in df_temp.columns:
-        df_temp["Due Date"] = ""
-        df_temp.to_excel(DATA_FILE, index=False)
-
-# Load data
-try:
-    df = pd.read_excel(DATA_FILE)
-    # Pastikan semua kolom yang diperlukan ada
-    for col in REQUIRED_COLUMNS:
-        if col not in df.columns:
-            df[col] = ""
-    df.to_excel(DATA_FILE, index=False)
-except Exception as e:
-    st.error(f"Error membaca file Excel: {str(e)}")
-    df = pd.DataFrame(columns=REQUIRED_COLUMNS)
-    df.to_excel(DATA_FILE, index=False)
+
+@st.cache_resource
+def get_storage(backend):
+    return open_storage(backend)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_data(_storage, path, signature):
+    # Baca ulang data hanya jika signature storage berubah
+    return _storage.load()
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_report_data(_storage, path, signature):
+    # Report Statistik hanya membaca kolom yang ditampilkan/dianalisis (query terpangkas), bukan tabel lengkap
+    return apply_schema(_storage.query(columns=REPORT_COLUMNS))
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def export_excel_bytes(_storage, path, signature):
+    buffer = BytesIO()
+    export_excel(_storage.load(), buffer)
+    return buffer.getvalue()
+
+
+@st.cache_resource
+def get_aggregate_store():
+    # Satu store per proses, dipakai bersama oleh semua sesi
+    return AggregateStore(APPROVED_VALUES)
+
+
+@st.cache_resource
+def get_key_index():
+    # Indeks No/Program No per proses; sync() memberi versi tetap untuk tabel yang dimuat sesi
+    return KeyIndex()
+
+
+@st.cache_resource
+def get_reminder_store():
+    return ReminderStore()
+
+
+@st.cache_resource
+def get_reminder_scheduler(_storage, path):
+    # Satu thread penjadwal pengingat per proses (kecuali dijalankan sebagai proses terpisah)
+    if REMINDER_SCHEDULER != "thread":
+        return None
+    scheduler = ReminderScheduler(_storage, get_reminder_store())
+    scheduler.start()
+    return scheduler
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def get_filter_masks(_df, path, signature):
+    return build_filter_masks(_df)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def get_sort_positions(_df, path, signature, column):
+    return sort_positions(_df, column)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def get_sla_report(_df, path, signature, filter_key, day):
+    # Analitik SLA per versi data, kombinasi filter dan tanggal
+    return compute_sla(_df, day)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def get_figure(name, key, _data):
+    # Figure dibangun sekali per isi data sumber (key = hash agregat), bukan setiap rerun
+    return FIGURE_BUILDERS[name](_data)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def get_month_labels(key, _months):
+    return month_labels(_months)
+
+
+def chart_figure(name, data):
+    return get_figure(name, chart_key(data), data)
+
+
+def read_data(reader):
+    # Data dibaca per halaman lewat fungsi ber-cache (kunci: signature storage).
+    # Jika gagal: tabel kosong dengan tipe kolom yang sama dan signature None, agar halaman tetap bisa dirender
+    with profiler.stage("load"):
+        try:
+            signature = storage.signature()
+            return reader(storage, storage.path, signature), signature
+        except Exception as e:
+            st.error(f"Error membaca data: {str(e)}")
+            return apply_schema(pd.DataFrame(columns=STORED_COLUMNS + [VERSION_COLUMN])), None
+
+
+# Profiling per rerun (opt-in lewat sidebar atau WPM_PROFILE=1)
+profiler = RerunProfiler(st.session_state.get("profiling", PROFILE_DEFAULT))
+
+with profiler.stage("open_storage"):
+    storage = get_storage(STORAGE_BACKEND)
+aggregate_store = get_aggregate_store()
+key_indexes = get_key_index()
+reminder_store = get_reminder_store()
+reminder_scheduler = get_reminder_scheduler(storage, storage.path)
 
 # ====================== FRONT PAGE ======================
 st.sidebar.title("Menu Navigasi")
 page = st.sidebar.radio("Pilih Halaman", ["Well Program Monitoring", "Report Statistik"])
+profiler.page = page
+
+# Kompaksi journal on-demand (backend Excel/Parquet)
+if isinstance(storage, JournaledStorage) and st.sidebar.button("Kompaksi Journal"):
+    storage.compact()
+    st.sidebar.success("Journal berhasil dikompaksi ke snapshot!")
 
 if page == "Well Program Monitoring":
     # ============== WELL PROGRAM MONITORING PAGE ==============
+    df, data_signature = read_data(load_data)
+    # Versi indeks yang cocok dengan df ini; dipegang selama rerun walau versi bersama berganti
+    key_index = key_indexes.sync(data_signature, df)
     st.title("Well Program Monitoring")
     
     # Fitur unggah file
     st.subheader("Unggah File Excel")
-    uploaded_file = st.file_uploader("Upload file Excel (.xlsx)", type=["xlsx"])
+    uploaded_file = st.file_uploader("Upload file Excel (.xlsx) atau CSV", type=["xlsx", "csv"])
+    streaming_mode = st.checkbox("Mode streaming (file besar)")
+    if streaming_mode:
+        chunk_size = st.number_input("Baris per potongan", min_value=100, value=INGEST_CHUNK_SIZE, step=100)
 
-    if uploaded_file:
+    if uploaded_file and streaming_mode:
+        # Baca per potongan: validasi seluruh file dulu, baru tambahkan potongan demi potongan
         try:
-            df_uploaded = pd.read_excel(uploaded_file)
-            uploaded_columns = df_uploaded.columns.tolist()
+            uploaded_columns = read_upload_header(uploaded_file, uploaded_file.name)
             if uploaded_columns != REQUIRED_COLUMNS:
                 st.error(f"Struktur kolom tidak sesuai. Harus: {REQUIRED_COLUMNS}, Ditemukan: {uploaded_columns}")
             else:
-                errors = []
-                for idx, row in df_uploaded.iterrows():
-                    if pd.isna(row["Well Name"]):
-                        errors.append(f"Baris {idx+2}: Well Name harus diisi")
-                    if not pd.isna(row["Program No"]) and row["Program No"] in df["Program No"].values:
-                        errors.append(f"Baris {idx+2}: Program No {row['Program No']} sudah ada")
-                    if row["Status"] not in VALID_STATUSES:
-                        errors.append(f"Baris {idx+2}: Status harus {VALID_STATUSES}")
-                    if row["Doc Initiator"] not in VALID_INITIATORS:
-                        errors.append(f"Baris {idx+2}: Doc Initiator harus {VALID_INITIATORS}")
-                    if row["Approval 1"] not in VALID_APPROVAL1_2:
-                        errors.append(f"Baris {idx+2}: Approval 1 harus {VALID_APPROVAL1_2}")
-                    if row["Approval 2"] not in VALID_APPROVAL1_2:
-                        errors.append(f"Baris {idx+2}: Approval 2 harus {VALID_APPROVAL1_2}")
-                    if row["Approval 3"] not in VALID_APPROVAL3:
-                        errors.append(f"Baris {idx+2}: Approval 3 harus {VALID_APPROVAL3}")
-                    if row["Approval 4"] not in VALID_APPROVAL4:
-                        errors.append(f"Baris {idx+2}: Approval 4 harus {VALID_APPROVAL4}")
-                    try:
-                        creation_date = pd.to_datetime(row["Creation Date"])
-                        due_date = pd.to_datetime(row["Due Date"])
-                        if pd.isna(creation_date) or pd.isna(due_date):
-                            errors.append(f"Baris {idx+2}: Creation Date atau Due Date tidak valid")
-                        elif due_date < creation_date:
-                            errors.append(f"Baris {idx+2}: Due Date tidak boleh sebelum Creation Date")
-                    except:
-                        errors.append(f"Baris {idx+2}: Format Creation Date atau Due Date tidak valid")
+                validation_key = (uploaded_file.file_id, int(chunk_size), data_signature)
+                cached_validation = st.session_state.get("streaming_validation")
+                if cached_validation and cached_validation[0] == validation_key:
+                    errors, error_count, total_rows, preview = cached_validation[1:]
+                else:
+                    # Hanya pesan pertama yang disimpan; sisanya dihitung saja agar memori tetap terbatas
+                    errors, error_count, total_rows, preview = [], 0, 0, None
+                    existing_program_nos = set(key_index.program_nos)
+                    seen_program_nos = set()
+                    progress = st.progress(0.0, text="Memvalidasi file...")
+                    with profiler.stage("validation"):
+                        for chunk, done in iter_upload_chunks(uploaded_file, uploaded_file.name, int(chunk_size)):
+                            chunk_errors = validate_upload(chunk, existing_program_nos, seen_program_nos)
+                            error_count += len(chunk_errors)
+                            errors.extend(chunk_errors[:MAX_DISPLAYED_ERRORS - len(errors)])
+                            total_rows += len(chunk)
+                            if preview is None:
+                                preview = chunk.head(PAGE_SIZE_OPTIONS[0])
+                            progress.progress(done, text=f"Memvalidasi file... {total_rows} baris")
+                    progress.empty()
+                    st.session_state["streaming_validation"] = (validation_key, errors, error_count, total_rows, preview)
+
+                if error_count:
+                    st.error(f"Kesalahan dalam file ({error_count} kesalahan):")
+                    for err in errors:
+                        st.write(err)
+                    if error_count > len(errors):
+                        st.write(f"... dan {error_count - len(errors)} kesalahan lainnya")
+                elif total_rows:
+                    preview = preview.assign(**{col: parse_dates(preview[col]) for col in DATE_COLUMNS})
+                    st.write(f"Preview Data ({len(preview)} dari {total_rows} baris):")
+                    st.dataframe(format_for_display(preview[REQUIRED_COLUMNS]))
+                    if st.button("Submit Data"):
+                        progress = st.progress(0.0, text="Menyimpan data...")
+                        inserted = 0
+                        for chunk, done in iter_upload_chunks(uploaded_file, uploaded_file.name, int(chunk_size)):
+                            chunk = chunk.assign(**{col: parse_dates(chunk[col]) for col in DATE_COLUMNS})
+                            inserted += storage.insert_many(chunk[REQUIRED_COLUMNS])
+                            progress.progress(done, text=f"Menyimpan data... {inserted} baris")
+                        aggregate_store.invalidate()
+                        key_indexes.invalidate()
+                        st.session_state.pop("streaming_validation", None)
+                        st.success(f"{inserted} baris berhasil disubmit!")
+                        st.rerun()
+        except Exception as e:
+            st.error(f"Error membaca file: {str(e)}")
 
+    elif uploaded_file:
+        try:
+            with profiler.stage("read_upload"):
+                if is_csv(uploaded_file.name):
+                    df_uploaded = pd.read_csv(uploaded_file)
+                else:
+                    df_uploaded = pd.read_excel(uploaded_file)
+            uploaded_columns = df_uploaded.columns.tolist()
+            if uploaded_columns != REQUIRED_COLUMNS:
+                st.error(f"Struktur kolom tidak sesuai. Harus: {REQUIRED_COLUMNS}, Ditemukan: {uploaded_columns}")
+            else:
+                with profiler.stage("validation"):
+                    errors = validate_upload(df_uploaded, set(key_index.program_nos))
                 if errors:
                     st.error("Kesalahan dalam file:")
                     for err in errors:
                         st.write(err)
                 else:
-                    df_uploaded["Creation Date"] = pd.to_datetime(df_uploaded["Creation Date"], errors='coerce').dt.strftime("%d-%b-%y")
-                    df_uploaded["Due Date"] = pd.to_datetime(df_uploaded["Due Date"], errors='coerce').dt.strftime("%d-%b-%y")
+                    df_uploaded["Creation Date"] = parse_dates(df_uploaded["Creation Date"])
+                    df_uploaded["Due Date"] = parse_dates(df_uploaded["Due Date"])
                     st.write("Preview Data:")
-                    st.dataframe(df_uploaded[REQUIRED_COLUMNS])
+                    st.dataframe(format_for_display(df_uploaded[REQUIRED_COLUMNS]))
                     if st.button("Submit Data"):
-                        df = pd.concat([df, df_uploaded], ignore_index=True)
-                        df["No"] = range(1, len(df) + 1)
-                        df.to_excel(DATA_FILE, index=False)
+                        storage.insert_many(df_uploaded[REQUIRED_COLUMNS])
+                        aggregate_store.invalidate()
+                        key_indexes.invalidate()
                         st.success("Data berhasil disubmit!")
-                        st.experimental_rerun()
+                        st.rerun()
         except Exception as e:
             st.error(f"Error membaca file: {str(e)}")
 
@@ -163,20 +292,18 @@ if page == "Well Program Monitoring":
         if save_button:
             if not nama_well:
                 st.error("Nama Well harus diisi!")
-            elif program_no and program_no in df["Program No"].values:
+            elif key_index.find_program_no(program_no) is not None:
                 st.error(f"Program No {program_no} sudah ada!")
             elif due_date < creation_date:
                 st.error("Due Date tidak boleh sebelum Creation Date!")
             else:
-                status = "COMPLETED" if all([approval1, approval2, approval3, approval4]) else "INPROGRESS"
-                new_no = len(df) + 1
+                status = derive_status([approval1, approval2, approval3, approval4])
                 new_data = {
-                    "No": new_no,
                     "Well Name": nama_well,
                     "Well Program Name": well_name if well_name else "",
                     "Program No": program_no if program_no else "",
-                    "Creation Date": creation_date.strftime("%d-%b-%y"),
-                    "Due Date": due_date.strftime("%d-%b-%y"),
+                    "Creation Date": creation_date,
+                    "Due Date": due_date,
                     "Status": status,
                     "Doc Initiator": initiator,
                     "Approval 1": approval1,
@@ -185,27 +312,40 @@ if page == "Well Program Monitoring":
                     "Approval 4": approval4,
                     "Remarks": remarks
                 }
-                df = pd.concat([df, pd.DataFrame([new_data])], ignore_index=True)
-                df.to_excel(DATA_FILE, index=False)
+                new_data.update(approval_timestamps(new_data))
+                new_data["No"], change = storage.insert(new_data)
+                aggregate_store.apply_change(change.before, change.after, new_row=new_data)
+                key_indexes.apply_change(change.before, change.after, new_row=new_data)
                 st.success("Data berhasil disimpan!")
-                st.experimental_rerun()
+                st.rerun()
 
     # Fitur edit dan hapus
     st.subheader("Edit / Hapus Data")
-    selected_index = st.number_input("Pilih index untuk edit/hapus (No):", min_value=1, max_value=len(df) if not df.empty else 1, step=1)
-
-    if selected_index and not df.empty and not df[df["No"] == selected_index].empty:
-        selected_row = df[df["No"] == selected_index].iloc[0]
+    selected_index = st.number_input("Pilih index untuk edit/hapus (No):", min_value=1, max_value=max(key_index.max_no, 1), step=1)
+
+    # No stabil (tidak dinomori ulang saat hapus); baris dicari lewat indeks, bukan scan tabel
+    selected_position = key_index.position(selected_index)
+    if selected_position is not None and int(df.iloc[selected_position][KEY_COLUMN]) != selected_index:
+        # Pengaman: indeks tidak cocok dengan tabel ini, jangan sampai baris lain yang diedit
+        key_indexes.invalidate()
+        selected_position = None
+    if selected_position is not None:
+        selected_row = df.iloc[selected_position]
+        # Versi baris yang terakhir ditampilkan di form; dipakai untuk compare-and-swap saat submit
+        shown_version = st.session_state.get("edit_version")
+        if shown_version and shown_version[0] == selected_index:
+            expected_version = shown_version[1]
+        else:
+            expected_version = int(selected_row[VERSION_COLUMN])
+        st.session_state["edit_version"] = (selected_index, int(selected_row[VERSION_COLUMN]))
         with st.form("edit_form"):
             edit_nama_well = st.text_input("Nama Well", selected_row["Well Name"])
             edit_well_name = st.text_input("Nama Dokumen Well Program (Opsional)", selected_row["Well Program Name"])
             edit_program_no = st.text_input("Nomor Program (Opsional)", selected_row["Program No"])
-            try:
-                edit_creation_date = st.date_input("Tanggal Submit", datetime.strptime(str(selected_row["Creation Date"]), "%d-%b-%y"))
-                edit_due_date = st.date_input("Due Date", datetime.strptime(str(selected_row["Due Date"]), "%d-%b-%y") if selected_row["Due Date"] else datetime.today() + timedelta(days=7))
-            except (ValueError, TypeError):
-                edit_creation_date = st.date_input("Tanggal Submit", datetime.today())
-                edit_due_date = st.date_input("Due Date", datetime.today() + timedelta(days=7))
+            current_creation_date = selected_row["Creation Date"]
+            current_due_date = selected_row["Due Date"]
+            edit_creation_date = st.date_input("Tanggal Submit", current_creation_date.date() if not pd.isna(current_creation_date) else datetime.today())
+            edit_due_date = st.date_input("Due Date", current_due_date.date() if not pd.isna(current_due_date) else datetime.today() + timedelta(days=7))
             edit_initiator = st.selectbox("Document Initiator", VALID_INITIATORS,
                                          index=VALID_INITIATORS.index(selected_row["Doc Initiator"]) if selected_row["Doc Initiator"] in VALID_INITIATORS else 0)
             edit_approval1 = st.selectbox("Approval 1", VALID_APPROVAL1_2,
@@ -223,43 +363,58 @@ if page == "Well Program Monitoring":
             if update_button:
                 if not edit_nama_well:
                     st.error("Nama Well harus diisi!")
-                elif edit_program_no and edit_program_no != selected_row["Program No"] and edit_program_no in df["Program No"].values:
+                elif key_index.find_program_no(edit_program_no) not in (None, selected_index):
                     st.error(f"Program No {edit_program_no} sudah ada!")
                 elif edit_due_date < edit_creation_date:
                     st.error("Due Date tidak boleh sebelum Creation Date!")
                 else:
-                    new_status = "COMPLETED" if all([edit_approval1, edit_approval2, edit_approval3, edit_approval4]) else "INPROGRESS"
-                    df.loc[df["No"] == selected_index] = [
-                        selected_index,
-                        edit_nama_well,
-                        edit_well_name if edit_well_name else "",
-                        edit_program_no if edit_program_no else "",
-                        edit_creation_date.strftime("%d-%b-%y"),
-                        edit_due_date.strftime("%d-%b-%y"),
-                        new_status,
-                        edit_initiator,
-                        edit_approval1,
-                        edit_approval2,
-                        edit_approval3,
-                        edit_approval4,
-                        edit_remarks
-                    ]
-                    df.to_excel(DATA_FILE, index=False)
-                    st.success("Data berhasil diperbarui!")
-                    st.experimental_rerun()
+                    new_status = derive_status([edit_approval1, edit_approval2, edit_approval3, edit_approval4])
+                    updated_data = {
+                        "No": selected_index,
+                        "Well Name": edit_nama_well,
+                        "Well Program Name": edit_well_name if edit_well_name else "",
+                        "Program No": edit_program_no if edit_program_no else "",
+                        "Creation Date": edit_creation_date,
+                        "Due Date": edit_due_date,
+                        "Status": new_status,
+                        "Doc Initiator": edit_initiator,
+                        "Approval 1": edit_approval1,
+                        "Approval 2": edit_approval2,
+                        "Approval 3": edit_approval3,
+                        "Approval 4": edit_approval4,
+                        "Remarks": edit_remarks
+                    }
+                    # Waktu approval hanya dicatat untuk approval yang berubah
+                    updated_data.update(approval_timestamps(updated_data, selected_row))
+                    try:
+                        _, change = storage.update(selected_index, updated_data, expected_version=expected_version)
+                    except ConflictError as e:
+                        st.error(str(e))
+                    else:
+                        aggregate_store.apply_change(change.before, change.after,
+                                                     old_row=selected_row.to_dict(), new_row=updated_data)
+                        key_indexes.apply_change(change.before, change.after,
+                                                 old_row=selected_row.to_dict(), new_row=updated_data)
+                        st.success("Data berhasil diperbarui!")
+                        st.rerun()
 
             if delete_button:
-                df = df[df["No"] != selected_index].reset_index(drop=True)
-                df["No"] = range(1, len(df) + 1)
-                df.to_excel(DATA_FILE, index=False)
-                st.success("Data berhasil dihapus!")
-                st.experimental_rerun()
+                try:
+                    _, change = storage.delete(selected_index, expected_version=expected_version)
+                except ConflictError as e:
+                    st.error(str(e))
+                else:
+                    aggregate_store.apply_change(change.before, change.after, old_row=selected_row.to_dict())
+                    key_indexes.apply_change(change.before, change.after, old_row=selected_row.to_dict())
+                    st.success("Data berhasil dihapus!")
+                    st.rerun()
     else:
         if selected_index:
             st.error("Indeks tidak valid atau tidak ada data!")
 
 elif page == "Report Statistik":
     # ============== REPORT STATISTIK PAGE ==============
+    df, data_signature = read_data(load_report_data)
     st.title("Report Statistik Well Program")
     
     # Tampilkan data dengan filter
@@ -269,205 +424,170 @@ elif page == "Report Statistik":
     with col1:
         st.write(" ")
     with col2:
-        filter_status = st.selectbox("Filter Status", ["Semua", "COMPLETED", "INPROGRESS"])
+        filter_status = st.selectbox("Filter Status", STATUS_FILTER_OPTIONS)
     with col3:
-        filter_approval1 = st.selectbox("Filter Approval 1", ["Semua", "Belum Diapprove", "Sudah Diapprove"])
+        filter_approval1 = st.selectbox("Filter Approval 1", APPROVAL_FILTER_OPTIONS)
     with col4:
-        filter_approval2 = st.selectbox("Filter Approval 2", ["Semua", "Belum Diapprove", "Sudah Diapprove"])
+        filter_approval2 = st.selectbox("Filter Approval 2", APPROVAL_FILTER_OPTIONS)
     with col5:
-        filter_approval3 = st.selectbox("Filter Approval 3", ["Semua", "Belum Diapprove", "Sudah Diapprove"])
+        filter_approval3 = st.selectbox("Filter Approval 3", APPROVAL_FILTER_OPTIONS)
     with col6:
-        filter_approval4 = st.selectbox("Filter Approval 4", ["Semua", "Belum Diapprove", "Sudah Diapprove"])
-
-    filtered_df = df.copy()
-    if filter_status != "Semua":
-        filtered_df = filtered_df[filtered_df["Status"] == filter_status]
-
-    if filter_approval1 == "Belum Diapprove":
-        filtered_df = filtered_df[filtered_df["Approval 1"] == ""]
-    elif filter_approval1 == "Sudah Diapprove":
-        filtered_df = filtered_df[filtered_df["Approval 1"].isin(["KRISTIANTO WIBOWO", "YULIANTO AGUS"])]
-
-    if filter_approval2 == "Belum Diapprove":
-        filtered_df = filtered_df[filtered_df["Approval 2"] == ""]
-    elif filter_approval2 == "Sudah Diapprove":
-        filtered_df = filtered_df[filtered_df["Approval 2"].isin(["KRISTIANTO WIBOWO", "YULIANTO AGUS"])]
-
-    if filter_approval3 == "Belum Diapprove":
-        filtered_df = filtered_df[filtered_df["Approval 3"] == ""]
-    elif filter_approval3 == "Sudah Diapprove":
-        filtered_df = filtered_df[filtered_df["Approval 3"] == "BUDI RIVAI WIJAYA"]
-
-    if filter_approval4 == "Belum Diapprove":
-        filtered_df = filtered_df[filtered_df["Approval 4"] == ""]
-    elif filter_approval4 == "Sudah Diapprove":
-        filtered_df = filtered_df[filtered_df["Approval 4"] == "PE TEAM"]
+        filter_approval4 = st.selectbox("Filter Approval 4", APPROVAL_FILTER_OPTIONS)
+
+    # Filter di server memakai mask yang sudah dihitung sebelumnya
+    filters = {
+        "Status": filter_status,
+        "Approval 1": filter_approval1,
+        "Approval 2": filter_approval2,
+        "Approval 3": filter_approval3,
+        "Approval 4": filter_approval4,
+    }
+    with profiler.stage("filtering"):
+        filter_masks = get_filter_masks(df, storage.path, data_signature)
+        filter_mask = combine_filter_masks(filter_masks, filters, len(df))
+        filtered_df = df[filter_mask]
 
     ordered_columns = [
         "No", "Well Name", "Well Program Name", "Program No", "Creation Date", "Due Date",
         "Status", "Doc Initiator", "Approval 1", "Approval 2", "Approval 3", "Approval 4", "Remarks"
     ]
-    st.dataframe(filtered_df[ordered_columns])
+
+    # Paginasi: hanya potongan halaman aktif yang dikirim ke browser
+    col_sort, col_order, col_size, col_page = st.columns(4)
+    with col_sort:
+        sort_column = st.selectbox("Urutkan berdasarkan", ordered_columns)
+    with col_order:
+        sort_ascending = st.selectbox("Urutan", ["Naik", "Turun"]) == "Naik"
+    with col_size:
+        page_size = st.selectbox("Baris per halaman", PAGE_SIZE_OPTIONS)
+    total_rows = int(filter_mask.sum())
+    total_pages = max(1, math.ceil(total_rows / page_size))
+    with col_page:
+        page_number = st.number_input("Halaman", min_value=1, max_value=total_pages, value=1, step=1)
+    page_number = min(int(page_number), total_pages)
+
+    with profiler.stage("table_page"):
+        order = get_sort_positions(df, storage.path, data_signature, sort_column)
+        page_df = df.iloc[page_positions(order, filter_mask, sort_ascending, page_size, page_number)]
+        st.dataframe(format_for_display(page_df[ordered_columns]))
+    first_row = (page_number - 1) * page_size + 1 if total_rows else 0
+    last_row = first_row + len(page_df) - 1 if total_rows else 0
+    st.caption(f"Menampilkan {first_row}-{last_row} dari {total_rows} data (halaman {page_number} dari {total_pages})")
+    # Workbook ekspor dibuat hanya saat diminta (di-cache per signature), bukan setiap kunjungan halaman
+    if st.button("Siapkan Excel"):
+        st.session_state["export_signature"] = data_signature
+    if data_signature is not None and st.session_state.get("export_signature") == data_signature:
+        if st.download_button(
+            "Download Excel",
+            data=export_excel_bytes(storage, storage.path, data_signature),
+            file_name="well_program_data.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        ):
+            # Sudah diunduh: rerun berikutnya tidak perlu mengirim ulang file
+            st.session_state.pop("export_signature", None)
 
     # Daftar Well yang Belum Diapprove dengan Pengingat
     st.subheader("Daftar Well yang Belum Diapprove dengan Pengingat")
 
-    today = datetime.today()
-    unapproved_data = []
-    for _, row in filtered_df.iterrows():
-        approvals = [
-            ("Approval 1", row["Approval 1"]),
-            ("Approval 2", row["Approval 2"]),
-            ("Approval 3", row["Approval 3"]),
-            ("Approval 4", row["Approval 4"])
-        ]
-        due_date = pd.to_datetime(row["Due Date"], format="%d-%b-%y", errors='coerce')
-        if pd.isna(due_date):
-            reminder_status = "Invalid Due Date"
+    approaching_days = st.number_input(
+        "Batas hari Approaching Due Date", min_value=0, value=REMINDER_APPROACHING_DAYS, step=1
+    )
+    with profiler.stage("reminder"):
+        # Dibaca dari hasil penjadwal; dihitung langsung hanya jika hasil tersimpan belum mutakhir
+        today = datetime.today()
+        unapproved_df = reminder_store.load(data_signature, today, approaching_days)
+        if unapproved_df is None:
+            if reminder_scheduler is not None:
+                reminder_scheduler.notify()
+                if reminder_scheduler.last_error:
+                    st.warning(
+                        f"Penjadwal pengingat gagal, pengingat dihitung langsung: {reminder_scheduler.last_error}"
+                    )
+            unapproved_df = build_reminder_table(filtered_df, today, approaching_days)
         else:
-            delta = (due_date - today).days
-            if delta < 0:
-                reminder_status = "Overdue"
-            elif delta <= 3:
-                reminder_status = "Approaching Due Date"
-            else:
-                reminder_status = "On Track"
-
-        for approver, value in approvals:
-            if value == "":
-                unapproved_data.append({
-                    "No": row["No"],
-                    "Well Name": row["Well Name"],
-                    "Well Program Name": row["Well Program Name"],
-                    "Program No": row["Program No"],
-                    "Approver": approver,
-                    "Creation Date": row["Creation Date"],
-                    "Due Date": row["Due Date"],
-                    "Reminder Status": reminder_status,
-                    "Status": row["Status"]
-                })
-
-    unapproved_df = pd.DataFrame(unapproved_data)
-    if not unapproved_df.empty:
-        st.dataframe(unapproved_df[["No", "Well Name", "Well Program Name", "Program No", "Approver", "Creation Date", "Due Date", "Reminder Status", "Status"]])
-    else:
-        st.info("Tidak ada well yang belum diapprove berdasarkan filter saat ini.")
+            unapproved_df = unapproved_df[unapproved_df["No"].isin(filtered_df["No"])].reset_index(drop=True)
+        if not unapproved_df.empty:
+            st.dataframe(format_for_display(unapproved_df[REMINDER_COLUMNS]))
+        else:
+            st.info("Tidak ada well yang belum diapprove berdasarkan filter saat ini.")
 
     # Statistik dan Grafik
-    st.subheader("Statistik Status")
-    if not filtered_df.empty:
-        status_counts = filtered_df["Status"].value_counts().reset_index()
-        status_counts.columns = ["Status", "Count"]
-        total = status_counts["Count"].sum()
-        status_counts["Percentage"] = (status_counts["Count"] / total * 100).round(2) if total > 0 else 0
-
-        fig_pie = px.pie(
-            status_counts,
-            names="Status",
-            values="Count",
-            title="Persentase Status Well Program (Filtered)",
-            color_discrete_map={"COMPLETED": "#2ecc71", "INPROGRESS": "#e74c3c"},
-            hover_data=["Percentage"],
-            labels={"Percentage": "%"}
-        )
-        fig_pie.update_traces(textinfo="label+value+percent", textposition="inside")
-        st.plotly_chart(fig_pie, use_container_width=True)
-
-        no_approval3 = len(filtered_df[filtered_df["Approval 3"] == ""])
-        no_approval4 = len(filtered_df[filtered_df["Approval 4"] == ""])
-        approval_data = pd.DataFrame({
-            "Approver": ["BUDI RIVAI WIJAYA", "PE TEAM"],
-            "Belum Approve": [no_approval3, no_approval4]
-        })
-        
-        total_unapproved = no_approval3 + no_approval4
-        percentages = [0, 0] if total_unapproved == 0 else [(no_approval3 / total_unapproved * 100), (no_approval4 / total_unapproved * 100)]
-
-        fig_bar = go.Figure()
-        fig_bar.add_trace(go.Bar(
-            x=approval_data["Approver"],
-            y=approval_data["Belum Approve"],
-            text=[f"{val}<br>{perc:.1f}%" for val, perc in zip(approval_data["Belum Approve"], percentages)],
-            textposition="auto",
-            marker_color=["#3498db", "#9b59b6"],
-            name="Belum Approve"
-        ))
-        fig_bar.update_layout(
-            title="Jumlah Well Program Belum Diapprove (Filtered)",
-            xaxis_title="Approver",
-            yaxis_title="Belum Diapprove",
-            showlegend=False
-        )
-        st.plotly_chart(fig_bar, use_container_width=True)
-
-        st.subheader("Status Approval oleh BUDI RIVAI WIJAYA")
-        budi_unapproved = len(filtered_df[filtered_df["Approval 3"] == ""])
-        budi_approved = len(filtered_df[filtered_df["Approval 3"] == "BUDI RIVAI WIJAYA"])
-        approval_status = pd.DataFrame({
-            "Status": ["Belum Diapprove", "Sudah Diapprove"],
-            "Jumlah": [budi_unapproved, budi_approved]
-        })
-
-        fig_budi = px.bar(
-            approval_status,
-            x="Status",
-            y="Jumlah",
-            title="Jumlah Well Program Belum/Sudah Diapprove oleh BUDI RIVAI WIJAYA",
-            text="Jumlah",
-            color="Status",
-            color_discrete_map={"Belum Diapprove": "#e74c3c", "Sudah Diapprove": "#2ecc71"}
-        )
-        fig_budi.update_traces(textposition="auto")
-        st.plotly_chart(fig_budi, use_container_width=True)
-
-        st.subheader("Jumlah Well Program yang Dibuat per Bulan")
-        filtered_df["Creation Date"] = pd.to_datetime(filtered_df["Creation Date"], format="%d-%b-%y", errors='coerce')
-        filtered_df["Month-Year"] = filtered_df["Creation Date"].dt.strftime("%b %Y")
-        monthly_counts = filtered_df["Month-Year"].value_counts().reset_index()
-        monthly_counts.columns = ["Month-Year", "Jumlah Well"]
-        monthly_counts["Date"] = pd.to_datetime(monthly_counts["Month-Year"], format="%b %Y", errors='coerce')
-        monthly_counts = monthly_counts.sort_values("Date")
-
-        fig_monthly = px.bar(
-            monthly_counts,
-            x="Month-Year",
-            y="Jumlah Well",
-            title="Jumlah Well Program yang Dibuat per Bulan",
-            text="Jumlah Well",
-            color_discrete_sequence=["#1f77b4"]
-        )
-        fig_monthly.update_traces(textposition="auto")
-        st.plotly_chart(fig_monthly, use_container_width=True)
-
-        st.subheader("Jumlah Well Program per Bulan (Berdasarkan Pilihan)")
-        month_year_options = monthly_counts["Month-Year"].tolist() if not monthly_counts.empty else ["Tidak ada data"]
-        selected_month_year = st.selectbox("Pilih Bulan", month_year_options)
-
-        if selected_month_year != "Tidak ada data":
-            selected_wells = filtered_df[filtered_df["Month-Year"] == selected_month_year]
-            selected_counts = {"BUDI RIVAI WIJAYA": 0, "PE TEAM": 0}
-            for _, row in selected_wells.iterrows():
-                if row["Approval 3"] != "":
-                    selected_counts["BUDI RIVAI WIJAYA"] += 1
-                if row["Approval 4"] != "":
-                    selected_counts["PE TEAM"] += 1
-
-            selected_data = pd.DataFrame({
-                "Approver": ["BUDI RIVAI WIJAYA", "PE TEAM"],
-                "Jumlah Well": [selected_counts["BUDI RIVAI WIJAYA"], selected_counts["PE TEAM"]]
-            })
-
-            fig_selected = px.bar(
-                selected_data,
-                x="Approver",
-                y="Jumlah Well",
-                title=f"Jumlah Well Program pada {selected_month_year}",
-                color="Approver",
-                color_discrete_map={"BUDI RIVAI WIJAYA": "#3498db", "PE TEAM": "#9b59b6"},
-                text="Jumlah Well"
-            )
-            fig_selected.update_traces(textposition="auto")
-            st.plotly_chart(fig_selected, use_container_width=True)
+    # Ringkasan dibaca dari store agregat (O(#grup)), bukan dihitung ulang dari tabel
+    with profiler.stage("aggregate"):
+        aggregate = aggregate_store.get(filters, data_signature, filtered_df)
+    if aggregate["total"] > 0:
+        # Hanya bagian grafik yang dipilih yang dibangun dan dikirim ke browser
+        chart_section = st.radio("Tampilkan Grafik", CHART_SECTIONS, horizontal=True, key="chart_section")
+
+        if chart_section == "Statistik Status":
+            st.subheader("Statistik Status")
+            with profiler.stage("chart_pie"):
+                st.plotly_chart(chart_figure("status_pie", aggregate["status"]), use_container_width=True)
+
+            with profiler.stage("chart_bar"):
+                st.plotly_chart(chart_figure("unapproved_bar", aggregate["unapproved"]), use_container_width=True)
+
+            st.subheader("Status Approval oleh BUDI RIVAI WIJAYA")
+            with profiler.stage("chart_budi"):
+                budi_counts = (aggregate["unapproved"]["Approval 3"], aggregate["approved"]["Approval 3"])
+                st.plotly_chart(chart_figure("budi_bar", budi_counts), use_container_width=True)
+
+        elif chart_section == "Per Bulan":
+            st.subheader("Jumlah Well Program yang Dibuat per Bulan")
+            with profiler.stage("chart_monthly"):
+                st.plotly_chart(chart_figure("monthly_bar", aggregate["monthly"]), use_container_width=True)
+
+            st.subheader("Jumlah Well Program per Bulan (Berdasarkan Pilihan)")
+            months = sorted(aggregate["monthly"])
+            month_year_options = get_month_labels(chart_key(months), months) if months else ["Tidak ada data"]
+            selected_month_year = st.selectbox("Pilih Bulan", month_year_options)
+
+            if selected_month_year != "Tidak ada data":
+                with profiler.stage("chart_selected"):
+                    selected_month = months[month_year_options.index(selected_month_year)]
+                    selected_counts = {
+                        "BUDI RIVAI WIJAYA": aggregate["monthly_approved"]["Approval 3"][selected_month],
+                        "PE TEAM": aggregate["monthly_approved"]["Approval 4"][selected_month]
+                    }
+                    st.plotly_chart(chart_figure("selected_month_bar", (selected_month_year, selected_counts)),
+                                    use_container_width=True)
+
+        else:
+            # SLA approval: lama tiap tahap, umur backlog dan throughput bulanan
+            st.subheader("SLA Approval")
+            with profiler.stage("sla"):
+                sla_report = get_sla_report(
+                    filtered_df, storage.path, data_signature, aggregate_store.key(filters), today.date()
+                )
+            if sla_report["events"] == 0:
+                st.info("Belum ada waktu approval yang tercatat untuk filter saat ini.")
+            else:
+                with profiler.stage("chart_stage_cycle"):
+                    st.plotly_chart(chart_figure("stage_cycle_bar", sla_report["stage_cycle"]),
+                                    use_container_width=True)
+
+                with profiler.stage("chart_approver_cycle"):
+                    st.plotly_chart(chart_figure("approver_cycle_bar", sla_report["approver_cycle"]),
+                                    use_container_width=True)
+
+            with profiler.stage("chart_aging"):
+                st.plotly_chart(chart_figure("aging_bar", sla_report["aging"]), use_container_width=True)
+
+            if not sla_report["throughput"].empty:
+                with profiler.stage("chart_throughput"):
+                    st.plotly_chart(chart_figure("throughput_line", sla_report["throughput"]),
+                                    use_container_width=True)
 
     else:
-        st.info("Belum ada data untuk ditampilkan.")
\ No newline at end of file
+        st.info("Belum ada data untuk ditampilkan.")
+
+# ====================== PROFILING ======================
+# Ditampilkan di akhir skrip agar semua tahap rerun ini sudah tercatat
+if st.sidebar.checkbox("Mode profiling", value=PROFILE_DEFAULT, key="profiling") and profiler.enabled:
+    with st.sidebar.expander("Profil rerun", expanded=True):
+        st.caption(f"Total rerun: {profiler.total_ms():.1f} ms")
+        if profiler.stages:
+            st.dataframe(pd.DataFrame(profiler.stages).rename(
+                columns={"stage": "Tahap", "ms": "Waktu (ms)", "peak_kb": "Puncak memori (KB)"}
+            ), hide_index=True)
+    profiler.write_log()
\ No newline at end of file
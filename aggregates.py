@@ -0,0 +1,131 @@
+import itertools
+import threading
+from collections import Counter
+
+import pandas as pd
+
+from well_program_core import APPROVAL_COLUMNS, APPROVED, FILTER_ALL, FILTER_COLUMNS, UNAPPROVED
+
+
+def _month_key(value):
+    # Bulan pembuatan sebagai "YYYY-MM"; tanggal kosong tidak dihitung
+    if value is None or value == "" or pd.isna(value):
+        return None
+    return pd.Timestamp(value).strftime("%Y-%m")
+
+
+def _bump(counter, name, sign):
+    # Hitungan nol dibuang agar grafik tidak menampilkan kategori kosong
+    counter[name] += sign
+    if counter[name] == 0:
+        del counter[name]
+
+
+def empty_aggregate():
+    return {
+        "total": 0,
+        "status": Counter(),
+        "unapproved": Counter(),
+        "approved": Counter(),
+        "monthly": Counter(),
+        "monthly_approved": {col: Counter() for col in APPROVAL_COLUMNS},
+    }
+
+
+def compute_aggregate(df, approved_values):
+    # Ringkasan lengkap dari tabel (sudah difilter) secara vektor
+    aggregate = empty_aggregate()
+    aggregate["total"] = len(df)
+    if df.empty:
+        return aggregate
+    status_counts = df["Status"].value_counts()
+    aggregate["status"].update({status: int(count) for status, count in status_counts.items() if count > 0})
+    # Dikelompokkan per Period bulanan; hanya indeks hasil (satu per bulan) yang diformat ke "YYYY-MM"
+    months = df["Creation Date"].dt.to_period("M")
+    monthly = months.value_counts()
+    aggregate["monthly"].update(dict(zip(monthly.index.strftime("%Y-%m"), monthly.tolist())))
+    for col in APPROVAL_COLUMNS:
+        aggregate["unapproved"][col] = int((df[col] == "").sum())
+        aggregate["approved"][col] = int(df[col].isin(approved_values[col]).sum())
+        signed = (df[col] != "").groupby(months).sum()
+        signed = signed[signed > 0]
+        aggregate["monthly_approved"][col].update(dict(zip(signed.index.strftime("%Y-%m"), signed.tolist())))
+    return aggregate
+
+
+class AggregateStore:
+    # Agregat dashboard per kombinasi filter; dihitung sekali lalu diperbarui inkremental
+    # oleh handler insert/update/delete, dan dikosongkan saat data berubah dari luar
+
+    def __init__(self, approved_values):
+        self.approved_values = approved_values
+        self.signature = None
+        self._aggregates = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(filters):
+        return tuple(filters.get(col, FILTER_ALL) for col in FILTER_COLUMNS)
+
+    def get(self, filters, signature, filtered_df):
+        # filtered_df hanya dipakai jika kombinasi filter ini belum pernah dihitung
+        key = self.key(filters)
+        with self._lock:
+            if signature != self.signature:
+                self._aggregates = {}
+                self.signature = signature
+            if key not in self._aggregates:
+                self._aggregates[key] = compute_aggregate(filtered_df, self.approved_values)
+            return self._aggregates[key]
+
+    def invalidate(self):
+        with self._lock:
+            self._aggregates = {}
+            self.signature = None
+
+    def _row_keys(self, row):
+        # Semua kombinasi filter yang mencakup baris ini
+        options = [[FILTER_ALL, row.get("Status")]]
+        for col in APPROVAL_COLUMNS:
+            value = row.get(col, "")
+            col_options = [FILTER_ALL]
+            if value == "":
+                col_options.append(UNAPPROVED)
+            elif value in self.approved_values[col]:
+                col_options.append(APPROVED)
+            options.append(col_options)
+        return itertools.product(*options)
+
+    def _apply(self, row, sign):
+        month = _month_key(row.get("Creation Date"))
+        for key in self._row_keys(row):
+            aggregate = self._aggregates.get(key)
+            if aggregate is None:
+                continue
+            aggregate["total"] += sign
+            _bump(aggregate["status"], row.get("Status"), sign)
+            if month is not None:
+                _bump(aggregate["monthly"], month, sign)
+            for col in APPROVAL_COLUMNS:
+                value = row.get(col, "")
+                if value == "":
+                    _bump(aggregate["unapproved"], col, sign)
+                    continue
+                if value in self.approved_values[col]:
+                    _bump(aggregate["approved"], col, sign)
+                if month is not None:
+                    _bump(aggregate["monthly_approved"][col], month, sign)
+
+    def apply_change(self, before_signature, after_signature, old_row=None, new_row=None):
+        # Terapkan satu perubahan baris. before/after: Change dari storage (diambil di dalam kunci tulis);
+        # jika store tidak berada tepat di versi sebelum perubahan (ada penulisan lain), kosongkan
+        with self._lock:
+            if self.signature != before_signature:
+                self._aggregates = {}
+                self.signature = None
+                return
+            if old_row is not None:
+                self._apply(old_row, -1)
+            if new_row is not None:
+                self._apply(new_row, 1)
+            self.signature = after_signature
@@ -0,0 +1,292 @@
+# Benchmark headless untuk operasi utama Well Program Monitoring.
+#
+#   python benchmarks/bench_well_program.py --sizes 1000 10000 100000 --output bench.json
+#   python benchmarks/bench_well_program.py --compare bench_lama.json --output bench_baru.json
+#
+# Data sintetis mengikuti REQUIRED_COLUMNS dan kosakata VALID_*; tidak butuh Streamlit atau jaringan.
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from aggregates import compute_aggregate  # noqa: E402
+from charts import FIGURE_BUILDERS, month_labels  # noqa: E402
+from reminders import SOURCE_COLUMNS as REMINDER_SOURCE_COLUMNS  # noqa: E402
+from sla import compute_sla  # noqa: E402
+from storage import ExcelStorage, JournaledStorage, ParquetStorage, SQLiteStorage  # noqa: E402
+from well_program_core import (  # noqa: E402
+    APPROVAL_AT_COLUMNS, APPROVAL_COLUMNS, APPROVED, APPROVED_VALUES, FILTER_ALL, REPORT_COLUMNS, REQUIRED_COLUMNS,
+    STORED_COLUMNS, UNAPPROVED, VALID_APPROVAL1_2, VALID_APPROVAL3, VALID_APPROVAL4, VALID_INITIATORS,
+    build_filter_masks, build_reminder_table, combine_filter_masks, derive_status, page_positions, sort_positions,
+    validate_upload
+)
+
+DEFAULT_SIZES = [1000, 10000]
+DEFAULT_BACKENDS = ["sqlite"]
+SINGLE_RECORD_OPERATIONS = 20
+# Kombinasi filter Report Statistik yang diukur (agregat dihitung sekali per kombinasi di aplikasi)
+REPORT_FILTERS = {
+    "active_unapproved3": {"Status": "INPROGRESS", "Approval 3": UNAPPROVED},
+    "done_approved4": {"Status": "COMPLETED", "Approval 4": APPROVED},
+    "approved1_pending2": {"Status": FILTER_ALL, "Approval 1": APPROVED, "Approval 2": UNAPPROVED},
+}
+REPORT_SORT_COLUMN = "Due Date"
+REPORT_PAGE_SIZE = 50
+APPROVAL_CHOICES = {
+    "Approval 1": VALID_APPROVAL1_2,
+    "Approval 2": VALID_APPROVAL1_2,
+    "Approval 3": VALID_APPROVAL3,
+    "Approval 4": VALID_APPROVAL4,
+}
+
+
+def generate_programs(n, seed=0, start_no=1):
+    # Data sintetis: tanggal tersebar ~3 tahun, sebagian approval kosong, Program No unik
+    rng = np.random.default_rng(seed)
+    creation = pd.Timestamp("2022-01-01") + pd.to_timedelta(rng.integers(0, 3 * 365, n), unit="D")
+    due = creation + pd.to_timedelta(rng.integers(1, 30, n), unit="D")
+    df = pd.DataFrame({
+        "No": np.arange(start_no, start_no + n),
+        "Well Name": [f"WELL-{i % 500:03d}" for i in range(n)],
+        "Well Program Name": [f"Program {i}" for i in range(n)],
+        "Program No": [f"WP-{seed}-{start_no + i:07d}" for i in range(n)],
+        "Creation Date": creation,
+        "Due Date": due,
+        "Doc Initiator": rng.choice(VALID_INITIATORS, n),
+        "Remarks": "",
+    })
+    for col, choices in APPROVAL_CHOICES.items():
+        df[col] = rng.choice(choices, n)
+    df["Status"] = [derive_status(approvals) for approvals in zip(*(df[col] for col in APPROVAL_COLUMNS))]
+    return df[REQUIRED_COLUMNS]
+
+
+def with_approval_times(df, seed=0):
+    # Waktu approval sintetis: tiap tahap yang terisi 0-20 hari setelah tahap sebelumnya
+    rng = np.random.default_rng(seed)
+    df = df.copy()
+    approved_at = df["Creation Date"]
+    for col, at_col in zip(APPROVAL_COLUMNS, APPROVAL_AT_COLUMNS):
+        approved_at = approved_at + pd.to_timedelta(rng.integers(0, 20, len(df)), unit="D")
+        df[at_col] = approved_at.where(df[col] != "")
+    return df
+
+
+def random_record(rng):
+    record = {
+        "Well Name": f"WELL-{rng.randint(0, 999):03d}",
+        "Well Program Name": "Benchmark",
+        "Program No": "",
+        "Creation Date": date(2024, 1, 1) + timedelta(days=rng.randint(0, 365)),
+        "Due Date": date(2025, 1, 1),
+        "Doc Initiator": rng.choice(VALID_INITIATORS),
+        "Remarks": "",
+    }
+    for col, choices in APPROVAL_CHOICES.items():
+        record[col] = rng.choice(choices)
+    record["Status"] = derive_status([record[col] for col in APPROVAL_COLUMNS])
+    return record
+
+
+def time_call(func, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+def open_backend(backend, directory):
+    if backend == "excel":
+        return ExcelStorage(os.path.join(directory, "bench.xlsx"), STORED_COLUMNS)
+    if backend == "parquet":
+        return ParquetStorage(os.path.join(directory, "bench_parquet"), STORED_COLUMNS)
+    return SQLiteStorage(os.path.join(directory, "bench.db"), STORED_COLUMNS)
+
+
+def run_size(size, backends, repeat, seed):
+    results = []
+
+    def record(backend, operation, timings, **extra):
+        entry = {
+            "size": size,
+            "backend": backend,
+            "operation": operation,
+            "min_s": min(timings),
+            "median_s": statistics.median(timings),
+            "repeat": len(timings),
+        }
+        entry.update(extra)
+        results.append(entry)
+        print(f"{size:>8} {backend:<7} {operation:<28} {entry['median_s'] * 1000:10.2f} ms")
+
+    data = generate_programs(size, seed)
+    for backend in backends:
+        with tempfile.TemporaryDirectory() as directory:
+            storage = open_backend(backend, directory)
+            storage.insert_many(data)
+            if isinstance(storage, JournaledStorage):
+                storage.compact()
+            # Load awal: instance baru setiap kali agar tidak memakai state di memori
+            timings, _ = time_call(lambda: open_backend(backend, directory).load(), repeat)
+            record(backend, "load", timings)
+            # Baca sebagian kolom (working set INPROGRESS) seperti penjadwal pengingat
+            timings, _ = time_call(
+                lambda: open_backend(backend, directory).query({"Status": "INPROGRESS"}, REMINDER_SOURCE_COLUMNS),
+                repeat
+            )
+            record(backend, "query_active_pruned", timings)
+            # Bacaan halaman Report Statistik: semua kolom laporan, tanpa kolom internal
+            timings, _ = time_call(lambda: open_backend(backend, directory).query(columns=REPORT_COLUMNS), repeat)
+            record(backend, "query_report", timings)
+
+            rng = random.Random(seed)
+            nos = [rng.randint(1, size) for _ in range(SINGLE_RECORD_OPERATIONS)]
+            timings, _ = time_call(lambda: storage.insert(random_record(rng)), SINGLE_RECORD_OPERATIONS)
+            record(backend, "save_single", timings)
+            timings = []
+            for no in nos:
+                start = time.perf_counter()
+                storage.update(no, random_record(rng))
+                timings.append(time.perf_counter() - start)
+            record(backend, "edit_single", timings)
+            timings = []
+            for no in nos:
+                start = time.perf_counter()
+                storage.delete(no)
+                timings.append(time.perf_counter() - start)
+            record(backend, "delete_single", timings)
+            # Load ulang setelah penulisan di atas (backend journal: snapshot + entri journal tertunda)
+            timings, _ = time_call(storage.load, repeat)
+            record(backend, "load_after_writes", timings)
+
+    # Operasi di memori: sama untuk semua backend
+    upload = generate_programs(size, seed + 1, start_no=1)
+    existing = data["Program No"]
+    timings, errors = time_call(lambda: validate_upload(upload, existing), repeat)
+    record("memory", "validate_upload", timings, errors=len(errors))
+
+    today = datetime(2024, 6, 1)
+    timings, reminders = time_call(lambda: build_reminder_table(data, today), repeat)
+    record("memory", "reminder_table", timings, rows=len(reminders))
+
+    # Jalur Report Statistik yang sama dengan aplikasi: mask filter -> agregat per kombinasi filter,
+    # urutan + satu halaman tabel, lalu pembangunan figure dari agregat
+    timings, masks = time_call(lambda: build_filter_masks(data), repeat)
+    record("memory", "filter_masks", timings)
+    filters = REPORT_FILTERS["active_unapproved3"]
+    timings, _ = time_call(lambda: data[combine_filter_masks(masks, filters, len(data))], repeat)
+    record("memory", "filter_apply", timings)
+
+    timings, _ = time_call(lambda: compute_aggregate(data, APPROVED_VALUES), repeat)
+    record("memory", "aggregate_all", timings)
+    for label, filters in REPORT_FILTERS.items():
+        filtered = data[combine_filter_masks(masks, filters, len(data))]
+        timings, _ = time_call(lambda: compute_aggregate(filtered, APPROVED_VALUES), repeat)
+        record("memory", f"aggregate_{label}", timings, rows=len(filtered))
+
+    def table_page():
+        mask = combine_filter_masks(masks, REPORT_FILTERS["active_unapproved3"], len(data))
+        order = sort_positions(data, REPORT_SORT_COLUMN)
+        return data.iloc[page_positions(order, mask, True, REPORT_PAGE_SIZE, 1)]
+
+    timings, _ = time_call(table_page, repeat)
+    record("memory", "table_page", timings)
+
+    sla_data = with_approval_times(data, seed)
+    timings, sla = time_call(lambda: compute_sla(sla_data, today), repeat)
+    record("memory", "sla", timings, events=sla["events"])
+
+    # Data masukan figure persis seperti yang dikirim aplikasi ke charts.FIGURE_BUILDERS
+    aggregate = compute_aggregate(data, APPROVED_VALUES)
+    months = sorted(aggregate["monthly"])
+    selected_month = months[-1]
+    figure_data = {
+        "status_pie": aggregate["status"],
+        "unapproved_bar": aggregate["unapproved"],
+        "budi_bar": (aggregate["unapproved"]["Approval 3"], aggregate["approved"]["Approval 3"]),
+        "monthly_bar": aggregate["monthly"],
+        "selected_month_bar": (month_labels([selected_month])[0], {
+            "BUDI RIVAI WIJAYA": aggregate["monthly_approved"]["Approval 3"][selected_month],
+            "PE TEAM": aggregate["monthly_approved"]["Approval 4"][selected_month],
+        }),
+        "stage_cycle_bar": sla["stage_cycle"],
+        "approver_cycle_bar": sla["approver_cycle"],
+        "aging_bar": sla["aging"],
+        "throughput_line": sla["throughput"],
+    }
+    for name, builder in FIGURE_BUILDERS.items():
+        timings, _ = time_call(lambda: builder(figure_data[name]), repeat)
+        record("memory", f"figure_{name}", timings)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    # Bandingkan median dengan hasil sebelumnya (rasio > 1 berarti lebih lambat)
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["size"], r["backend"], r["operation"]): r for r in json.load(f)["results"]}
+    print(f"\nPerbandingan dengan {baseline_path}:")
+    for result in results:
+        previous = baseline.get((result["size"], result["backend"], result["operation"]))
+        if previous and previous["median_s"] > 0:
+            ratio = result["median_s"] / previous["median_s"]
+            flag = "  <-- lebih lambat" if ratio > 1.2 else ""
+            print(f"{result['size']:>8} {result['backend']:<7} {result['operation']:<28} x{ratio:6.2f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Well Program Monitoring")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--backends", nargs="+", choices=["sqlite", "excel", "parquet"], default=DEFAULT_BACKENDS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="file JSON hasil benchmark sebelumnya")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        results.extend(run_size(size, args.backends, args.repeat, args.seed))
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nHasil disimpan ke {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import os
+import json
+import hashlib
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Deret bulanan lebih panjang dari ini dijumlahkan per kuartal, lalu per tahun, agar JSON figure tetap kecil
+MAX_SERIES_POINTS = int(os.environ.get("WPM_MAX_SERIES_POINTS", "36"))
+# (frekuensi Period, format label, satuan untuk judul), dari yang paling rinci
+SERIES_BUCKETS = [("M", "%b %Y", "Bulan"), ("Q", "%Y Q%q", "Kuartal"), ("Y", "%Y", "Tahun")]
+CYCLE_COLORS = {"Median (hari)": "#3498db", "P90 (hari)": "#e67e22"}
+
+
+def _jsonable(value):
+    if isinstance(value, pd.DataFrame):
+        return value.to_dict("split")
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def chart_key(data):
+    # Hash isi data sumber grafik (Counter/dict/DataFrame kecil); dipakai sebagai kunci cache figure
+    payload = json.dumps(data, sort_keys=True, default=_jsonable)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def month_labels(months):
+    # "YYYY-MM" -> "Jan 2024", urutan dipertahankan
+    return pd.PeriodIndex(list(months), freq="M").strftime("%b %Y").tolist()
+
+
+def bucket_monthly(table, max_points=MAX_SERIES_POINTS):
+    # table: kolom "Month" ("YYYY-MM") + kolom angka. Hasil: kolom "Periode" + jumlah per periode, dan satuannya
+    months = pd.PeriodIndex(table["Month"], freq="M")
+    for freq, label_format, unit in SERIES_BUCKETS:
+        periods = months.asfreq(freq)
+        if periods.nunique() <= max_points:
+            break
+    bucketed = table.drop(columns="Month").groupby(periods, sort=True).sum()
+    bucketed.index = bucketed.index.strftime(label_format)
+    return bucketed.rename_axis("Periode").reset_index(), unit
+
+
+def status_pie(status):
+    status_counts = pd.DataFrame(sorted(status.items()), columns=["Status", "Count"])
+    total = status_counts["Count"].sum()
+    status_counts["Percentage"] = (status_counts["Count"] / total * 100).round(2) if total > 0 else 0
+
+    fig_pie = px.pie(
+        status_counts,
+        names="Status",
+        values="Count",
+        title="Persentase Status Well Program (Filtered)",
+        color_discrete_map={"COMPLETED": "#2ecc71", "INPROGRESS": "#e74c3c"},
+        hover_data=["Percentage"],
+        labels={"Percentage": "%"}
+    )
+    fig_pie.update_traces(textinfo="label+value+percent", textposition="inside")
+    return fig_pie
+
+
+def unapproved_bar(unapproved):
+    no_approval3 = unapproved["Approval 3"]
+    no_approval4 = unapproved["Approval 4"]
+    approval_data = pd.DataFrame({
+        "Approver": ["BUDI RIVAI WIJAYA", "PE TEAM"],
+        "Belum Approve": [no_approval3, no_approval4]
+    })
+
+    total_unapproved = no_approval3 + no_approval4
+    percentages = [0, 0] if total_unapproved == 0 else \
+        [(no_approval3 / total_unapproved * 100), (no_approval4 / total_unapproved * 100)]
+
+    fig_bar = go.Figure()
+    fig_bar.add_trace(go.Bar(
+        x=approval_data["Approver"],
+        y=approval_data["Belum Approve"],
+        text=[f"{val}<br>{perc:.1f}%" for val, perc in zip(approval_data["Belum Approve"], percentages)],
+        textposition="auto",
+        marker_color=["#3498db", "#9b59b6"],
+        name="Belum Approve"
+    ))
+    fig_bar.update_layout(
+        title="Jumlah Well Program Belum Diapprove (Filtered)",
+        xaxis_title="Approver",
+        yaxis_title="Belum Diapprove",
+        showlegend=False
+    )
+    return fig_bar
+
+
+def budi_bar(counts):
+    budi_unapproved, budi_approved = counts
+    approval_status = pd.DataFrame({
+        "Status": ["Belum Diapprove", "Sudah Diapprove"],
+        "Jumlah": [budi_unapproved, budi_approved]
+    })
+
+    fig_budi = px.bar(
+        approval_status,
+        x="Status",
+        y="Jumlah",
+        title="Jumlah Well Program Belum/Sudah Diapprove oleh BUDI RIVAI WIJAYA",
+        text="Jumlah",
+        color="Status",
+        color_discrete_map={"Belum Diapprove": "#e74c3c", "Sudah Diapprove": "#2ecc71"}
+    )
+    fig_budi.update_traces(textposition="auto")
+    return fig_budi
+
+
+def monthly_bar(monthly):
+    monthly_counts = pd.DataFrame(sorted(monthly.items()), columns=["Month", "Jumlah Well"])
+    monthly_counts, unit = bucket_monthly(monthly_counts)
+
+    fig_monthly = px.bar(
+        monthly_counts,
+        x="Periode",
+        y="Jumlah Well",
+        title=f"Jumlah Well Program yang Dibuat per {unit}",
+        text="Jumlah Well",
+        color_discrete_sequence=["#1f77b4"]
+    )
+    fig_monthly.update_traces(textposition="auto")
+    return fig_monthly
+
+
+def selected_month_bar(selection):
+    selected_month_year, selected_counts = selection
+    selected_data = pd.DataFrame({
+        "Approver": ["BUDI RIVAI WIJAYA", "PE TEAM"],
+        "Jumlah Well": [selected_counts["BUDI RIVAI WIJAYA"], selected_counts["PE TEAM"]]
+    })
+
+    fig_selected = px.bar(
+        selected_data,
+        x="Approver",
+        y="Jumlah Well",
+        title=f"Jumlah Well Program pada {selected_month_year}",
+        color="Approver",
+        color_discrete_map={"BUDI RIVAI WIJAYA": "#3498db", "PE TEAM": "#9b59b6"},
+        text="Jumlah Well"
+    )
+    fig_selected.update_traces(textposition="auto")
+    return fig_selected
+
+
+def _cycle_bar(cycle, by, title):
+    fig_cycle = px.bar(
+        cycle.melt(id_vars=by, value_vars=list(CYCLE_COLORS), var_name="Statistik", value_name="Hari"),
+        x=by,
+        y="Hari",
+        color="Statistik",
+        barmode="group",
+        title=title,
+        text="Hari",
+        color_discrete_map=CYCLE_COLORS
+    )
+    fig_cycle.update_traces(textposition="auto")
+    return fig_cycle
+
+
+def stage_cycle_bar(stage_cycle):
+    return _cycle_bar(stage_cycle, "Stage", "Lama Proses per Tahap Approval (Median dan P90)")
+
+
+def approver_cycle_bar(approver_cycle):
+    return _cycle_bar(approver_cycle, "Approver", "Lama Proses per Approver (Median dan P90)")
+
+
+def aging_bar(aging):
+    return px.bar(
+        aging.melt(id_vars="Stage", var_name="Umur", value_name="Jumlah"),
+        x="Stage",
+        y="Jumlah",
+        color="Umur",
+        title="Umur Backlog Approval yang Belum Diisi",
+        text="Jumlah"
+    )
+
+
+def throughput_line(throughput):
+    throughput, unit = bucket_monthly(throughput)
+    return px.line(
+        throughput.melt(id_vars="Periode", var_name="Tahap", value_name="Jumlah"),
+        x="Periode",
+        y="Jumlah",
+        color="Tahap",
+        markers=True,
+        title=f"Throughput Approval per {unit}"
+    )
+
+
+# Nama grafik -> fungsi pembangun figure (dipanggil lewat cache di aplikasi)
+FIGURE_BUILDERS = {
+    "status_pie": status_pie,
+    "unapproved_bar": unapproved_bar,
+    "budi_bar": budi_bar,
+    "monthly_bar": monthly_bar,
+    "selected_month_bar": selected_month_bar,
+    "stage_cycle_bar": stage_cycle_bar,
+    "approver_cycle_bar": approver_cycle_bar,
+    "aging_bar": aging_bar,
+    "throughput_line": throughput_line,
+}
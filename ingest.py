@@ -0,0 +1,97 @@
+import os
+
+import pandas as pd
+
+# Jumlah baris per potongan saat membaca file besar (membatasi pemakaian memori)
+INGEST_CHUNK_SIZE = int(os.environ.get("WPM_INGEST_CHUNK_SIZE", "5000"))
+
+
+def is_csv(filename):
+    return filename.lower().endswith(".csv")
+
+
+# Ukuran blok saat menghitung baris CSV
+COUNT_BLOCK_SIZE = 1024 * 1024
+
+
+def _count_data_lines(file):
+    # Jumlah baris data (tanpa header) dengan membaca per blok; tidak memuat seluruh file sekaligus
+    position = file.tell()
+    file.seek(0)
+    lines, last = 0, b"\n"
+    for block in iter(lambda: file.read(COUNT_BLOCK_SIZE), b""):
+        lines += block.count(b"\n")
+        last = block[-1:]
+    file.seek(position)
+    if last != b"\n":
+        lines += 1
+    return max(lines - 1, 1)
+
+
+def read_upload_header(file, filename):
+    # Hanya baris header, tanpa memuat isi file
+    file.seek(0)
+    if is_csv(filename):
+        columns = pd.read_csv(file, nrows=0).columns.tolist()
+    else:
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        try:
+            header = next(workbook.worksheets[0].iter_rows(max_row=1, values_only=True), ())
+        finally:
+            workbook.close()
+        columns = [col for col in header if col is not None]
+    file.seek(0)
+    return columns
+
+
+def _iter_csv_chunks(file, chunk_size):
+    # Progres menurut baris yang sudah dibaca; posisi file tidak bisa dipakai karena parser C
+    # sudah membaca isi file ke buffer sejak awal
+    total_rows = _count_data_lines(file)
+    done = 0
+    with pd.read_csv(file, chunksize=chunk_size) as reader:
+        for chunk in reader:
+            done += len(chunk)
+            yield chunk, min(done / total_rows, 1.0)
+
+
+def _iter_xlsx_chunks(file, chunk_size):
+    from openpyxl import load_workbook
+
+    # read_only + iter_rows: baris dibaca bertahap tanpa memuat seluruh workbook
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        total_rows = max((sheet.max_row or 1) - 1, 1)
+        rows = sheet.iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        while header and header[-1] is None:
+            header.pop()
+        buffer, positions = [], []
+        done = 0
+        for position, row in enumerate(rows):
+            done += 1
+            row = row[:len(header)]
+            if all(value is None for value in row):
+                continue
+            buffer.append(row)
+            positions.append(position)
+            if len(buffer) >= chunk_size:
+                yield pd.DataFrame(buffer, columns=header, index=positions), min(done / total_rows, 1.0)
+                buffer, positions = [], []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=header, index=positions), 1.0
+    finally:
+        workbook.close()
+
+
+def iter_upload_chunks(file, filename, chunk_size=INGEST_CHUNK_SIZE):
+    # Menghasilkan (potongan DataFrame, progres 0..1); index = posisi baris data (0 = baris ke-2 di file)
+    file.seek(0)
+    if is_csv(filename):
+        yield from _iter_csv_chunks(file, chunk_size)
+    else:
+        yield from _iter_xlsx_chunks(file, chunk_size)
+    file.seek(0)
@@ -0,0 +1,71 @@
+import os
+import json
+
+
+class Journal:
+    # Journal append-only (JSON-lines): satu perubahan = satu baris, di-fsync sebelum dianggap tersimpan
+
+    def __init__(self, path):
+        self.path = path
+        if not os.path.exists(self.path):
+            open(self.path, "a", encoding="utf-8").close()
+
+    def size(self):
+        return os.path.getsize(self.path)
+
+    def _repair_tail(self):
+        # Potong baris terakhir yang tidak lengkap (sisa crash) agar entri baru tidak tersambung ke sana
+        with open(self.path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            if end == 0:
+                return
+            f.seek(end - 1)
+            if f.read(1) == b"\n":
+                return
+            f.seek(0)
+            data = f.read()
+            f.truncate(data.rfind(b"\n") + 1)
+
+    def append(self, entry):
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self._repair_tail()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read(self, offset=0):
+        # Baca entri mulai dari offset byte; baris terakhir yang belum lengkap (crash saat menulis) diabaikan
+        if self.size() < offset:
+            offset = 0
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        entries = []
+        consumed = 0
+        for raw_line in data.splitlines(keepends=True):
+            if not raw_line.endswith(b"\n"):
+                break
+            consumed += len(raw_line)
+            raw_line = raw_line.strip()
+            if not raw_line:
+                continue
+            try:
+                entries.append(json.loads(raw_line))
+            except json.JSONDecodeError:
+                continue
+        return entries, offset + consumed
+
+    def truncate_through(self, seq):
+        # Buang entri yang sudah masuk snapshot (seq <= seq); ditulis ulang lewat file sementara + rename atomik
+        entries, _ = self.read(0)
+        remaining = [entry for entry in entries if entry.get("seq", 0) > seq]
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in remaining:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        return len(remaining)
@@ -0,0 +1,159 @@
+import os
+import json
+import shutil
+
+import pandas as pd
+
+from well_program_core import DATE_COLUMNS, KEY_COLUMN
+
+# Snapshot Parquet berversi:
+#   <root>/CURRENT                 nama versi aktif (ditulis atomik)
+#   <root>/v000007/manifest.json   seq journal, last_no, kolom dan daftar partisi
+#   <root>/v000007/active.parquet  program INPROGRESS (working set kecil)
+#   <root>/v000007/completed-2024-01.parquet  program COMPLETED per bulan Creation Date
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+ACTIVE_PARTITION = "active"
+ACTIVE_STATUS = "INPROGRESS"
+HISTORY_PREFIX = "completed-"
+# Versi lama yang disimpan (pembaca di proses lain mungkin masih memakainya)
+KEEP_VERSIONS = 3
+
+
+def _pyarrow():
+    # pyarrow opsional: hanya dibutuhkan jika backend/format Parquet dipakai
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Format Parquet membutuhkan pyarrow (pip install pyarrow)") from e
+    return pa, pq
+
+
+def _fsync_dir(path):
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def current_version(root):
+    try:
+        with open(os.path.join(root, CURRENT_FILE), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def read_manifest(root, version=None):
+    version = version or current_version(root)
+    if version is None:
+        return None
+    with open(os.path.join(root, version, MANIFEST_FILE), encoding="utf-8") as f:
+        manifest = json.load(f)
+    manifest["version"] = version
+    return manifest
+
+
+def partition_names(df):
+    # INPROGRESS -> active; COMPLETED -> completed-YYYY-MM (tanpa Creation Date: completed-none)
+    months = df["Creation Date"].dt.strftime("%Y-%m").fillna("none")
+    history = HISTORY_PREFIX + months
+    return history.where(df["Status"].astype(str) != ACTIVE_STATUS, ACTIVE_PARTITION)
+
+
+def _partition_hash(part):
+    return str(int(pd.util.hash_pandas_object(part, index=False).sum()))
+
+
+def write_snapshot(root, df, seq, last_no):
+    # Tulis versi baru ke folder sementara, rename, lalu pindahkan CURRENT (atomik).
+    # Partisi yang isinya tidak berubah di-hardlink dari versi sebelumnya, tidak ditulis ulang.
+    pa, pq = _pyarrow()
+    os.makedirs(root, exist_ok=True)
+    previous = read_manifest(root)
+    number = int(previous["version"][1:]) + 1 if previous else 1
+    version = f"v{number:06d}"
+    final_dir = os.path.join(root, version)
+    tmp_dir = os.path.join(root, f".{version}.tmp{os.getpid()}")
+    for path in (final_dir, tmp_dir):
+        # Sisa penulisan yang gagal (belum pernah ditunjuk CURRENT)
+        shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    df = df.reset_index(drop=True)
+    text_columns = [col for col in df.columns if col not in DATE_COLUMNS and not pd.api.types.is_integer_dtype(df[col])]
+    df[text_columns] = df[text_columns].astype(str)
+    partitions = {}
+    previous_partitions = previous["partitions"] if previous else {}
+    for name, part in df.groupby(partition_names(df), sort=True):
+        part = part.reset_index(drop=True)
+        filename = name + ".parquet"
+        digest = _partition_hash(part)
+        target = os.path.join(tmp_dir, filename)
+        old = previous_partitions.get(name)
+        if old and old["hash"] == digest and old["rows"] == len(part):
+            source = os.path.join(root, previous["version"], old["file"])
+            try:
+                os.link(source, target)
+            except OSError:
+                shutil.copy2(source, target)
+        else:
+            pq.write_table(pa.Table.from_pandas(part, preserve_index=False), target)
+        partitions[name] = {"file": filename, "rows": len(part), "hash": digest}
+
+    manifest = {"seq": seq, "last_no": last_no, "columns": list(df.columns), "partitions": partitions}
+    with open(os.path.join(tmp_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.rename(tmp_dir, final_dir)
+
+    current_tmp = os.path.join(root, f"{CURRENT_FILE}.tmp{os.getpid()}")
+    with open(current_tmp, "w", encoding="utf-8") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(current_tmp, os.path.join(root, CURRENT_FILE))
+    _fsync_dir(root)
+    _prune_versions(root, version)
+    return version
+
+
+def _prune_versions(root, current):
+    versions = sorted(name for name in os.listdir(root) if name.startswith("v") and name <= current)
+    for name in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+def read_snapshot(root, columns=None, active=True, history=True, months=None, version=None):
+    # Baca snapshot (default: versi aktif) dengan memory map; hanya kolom dan partisi yang diminta.
+    # months: daftar "YYYY-MM" untuk membatasi partisi riwayat (COMPLETED)
+    pa, pq = _pyarrow()
+    manifest = read_manifest(root, version)
+    if manifest is None:
+        return None, None
+    selected = list(manifest["columns"]) if columns is None else list(columns)
+    if KEY_COLUMN in manifest["columns"] and KEY_COLUMN not in selected:
+        selected.insert(0, KEY_COLUMN)
+    tables = []
+    for name, partition in sorted(manifest["partitions"].items()):
+        if name == ACTIVE_PARTITION:
+            if not active:
+                continue
+        elif not history or (months is not None and name[len(HISTORY_PREFIX):] not in months):
+            continue
+        path = os.path.join(root, manifest["version"], partition["file"])
+        tables.append(pq.read_table(path, columns=selected, memory_map=True))
+    if not tables:
+        return pd.DataFrame(columns=selected), manifest
+    df = pa.concat_tables(tables).to_pandas()
+    # Urutan baris sama dengan load() backend lain: menurut No
+    if KEY_COLUMN in df.columns:
+        df = df.sort_values(KEY_COLUMN, kind="stable").reset_index(drop=True)
+    if columns is not None:
+        df = df[list(columns)]
+    return df, manifest
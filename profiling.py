@@ -0,0 +1,87 @@
+import os
+import json
+import time
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# Profiling opt-in: WPM_PROFILE=1 atau toggle di sidebar
+PROFILE_DEFAULT = os.environ.get("WPM_PROFILE", "") == "1"
+METRICS_LOG = os.environ.get("WPM_METRICS_LOG", "data/metrics.log")
+
+# tracemalloc berlaku untuk seluruh proses (semua sesi Streamlit): dinyalakan saat tahap pertama
+# yang diprofil dimulai dan dimatikan saat tahap terakhir selesai, hanya jika dinyalakan di sini
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_started = False
+
+
+def _acquire_tracing():
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        _tracing_users += 1
+
+
+def _release_tracing():
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+
+class RerunProfiler:
+    # Waktu (wall-clock) dan puncak memori (tracemalloc) per tahap dalam satu rerun
+
+    def __init__(self, enabled, page=None):
+        self.enabled = enabled
+        self.page = page
+        self.stages = []
+        self._started_at = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        # Sesi tanpa profiling tidak menyentuh tracemalloc; puncak memori bisa ikut memuat alokasi
+        # sesi lain yang sedang diprofil bersamaan (tracemalloc tidak bisa dipisah per thread)
+        if not self.enabled:
+            yield
+            return
+        _acquire_tracing()
+        try:
+            tracemalloc.reset_peak()
+            memory_before, _ = tracemalloc.get_traced_memory()
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                elapsed = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                self.stages.append({
+                    "stage": name,
+                    "ms": round(elapsed * 1000, 2),
+                    "peak_kb": round(max(peak - memory_before, 0) / 1024, 1),
+                })
+        finally:
+            _release_tracing()
+
+    def total_ms(self):
+        return round((time.perf_counter() - self._started_at) * 1000, 2)
+
+    def write_log(self, path=METRICS_LOG):
+        # Satu baris JSON per rerun agar mudah dibandingkan antar versi
+        if not self.enabled or not self.stages:
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        entry = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "page": self.page,
+            "total_ms": self.total_ms(),
+            "stages": self.stages,
+        }
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
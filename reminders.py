@@ -0,0 +1,229 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import argparse
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from storage import STORED_DATE_FORMAT, _quote, apply_schema, parse_stored_dates
+from well_program_core import (
+    APPROVAL_COLUMNS, DATE_COLUMNS, REMINDER_APPROACHING_DAYS, REMINDER_COLUMNS, STORAGE_BACKEND,
+    build_reminder_table, open_storage
+)
+
+# Tabel pengingat yang sudah dihitung dan folder outbox untuk notifier
+REMINDER_DB = os.environ.get("WPM_REMINDER_DB", "data/reminders.db")
+OUTBOX_DIR = os.environ.get("WPM_OUTBOX_DIR", "data/outbox")
+# Jeda antar pengecekan penjadwal (detik); hitung ulang hanya jika data atau tanggal berubah
+REMINDER_INTERVAL = int(os.environ.get("WPM_REMINDER_INTERVAL", "60"))
+# "thread": penjadwal berjalan di proses Streamlit; "off": dijalankan terpisah lewat `python reminders.py`
+REMINDER_SCHEDULER = os.environ.get("WPM_REMINDER_SCHEDULER", "thread")
+# Status yang masuk digest per approver
+DIGEST_STATUSES = ["Overdue", "Approaching Due Date"]
+# Hanya kolom ini yang dibaca dari storage saat menghitung pengingat
+SOURCE_COLUMNS = [col for col in REMINDER_COLUMNS if col not in ("Approver", "Reminder Status")] + APPROVAL_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderStore:
+    # Hasil pengingat per versi data dan tanggal, disimpan di SQLite dengan indeks Due Date
+
+    def __init__(self, path=REMINDER_DB):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            column_defs = [f"{_quote(col)} {'INTEGER' if col == 'No' else 'TEXT'}" for col in REMINDER_COLUMNS]
+            conn.execute(f"CREATE TABLE IF NOT EXISTS reminders (position INTEGER NOT NULL, {', '.join(column_defs)})")
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_reminders_due_date ON reminders ("Due Date")')
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS state (signature TEXT, day TEXT, approaching_days INTEGER, "
+                "computed_at TEXT, digest_key TEXT)"
+            )
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout = 30000")
+        return conn
+
+    @staticmethod
+    def _state_key(signature, today, approaching_days):
+        return json.dumps(signature), pd.Timestamp(today).strftime(STORED_DATE_FORMAT), int(approaching_days)
+
+    def state(self):
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT signature, day, approaching_days, computed_at, digest_key FROM state"
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        return dict(zip(["signature", "day", "approaching_days", "computed_at", "digest_key"], row))
+
+    def is_current(self, signature, today, approaching_days):
+        state = self.state()
+        if state is None:
+            return False
+        return (state["signature"], state["day"], state["approaching_days"]) == \
+            self._state_key(signature, today, approaching_days)
+
+    def replace(self, table, signature, today, approaching_days, digest_key=None):
+        # Ganti seluruh isi dalam satu transaksi; pembaca melihat versi lama atau baru, tidak setengah
+        rows = table[REMINDER_COLUMNS].copy()
+        for col in DATE_COLUMNS:
+            # Tabel kosong bisa bertipe object; parse dulu agar .dt selalu tersedia
+            rows[col] = parse_stored_dates(rows[col]).dt.strftime(STORED_DATE_FORMAT).fillna("")
+        records = [[position] + [value.item() if hasattr(value, "item") else value for value in row]
+                   for position, row in enumerate(rows.itertuples(index=False, name=None))]
+        columns = ["position"] + REMINDER_COLUMNS
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM reminders")
+                conn.executemany(
+                    f"INSERT INTO reminders ({', '.join(_quote(col) for col in columns)}) "
+                    f"VALUES ({', '.join('?' for _ in columns)})",
+                    records
+                )
+                conn.execute("DELETE FROM state")
+                conn.execute(
+                    "INSERT INTO state VALUES (?, ?, ?, ?, ?)",
+                    self._state_key(signature, today, approaching_days)
+                    + (datetime.now().isoformat(timespec="seconds"), digest_key)
+                )
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def load(self, signature, today, approaching_days):
+        # None jika hasil tersimpan tidak sesuai versi data/tanggal/batas hari yang diminta
+        if not self.is_current(signature, today, approaching_days):
+            return None
+        conn = self._connect()
+        try:
+            table = pd.read_sql_query(
+                f"SELECT {', '.join(_quote(col) for col in REMINDER_COLUMNS)} FROM reminders ORDER BY position", conn
+            )
+        finally:
+            conn.close()
+        for col in DATE_COLUMNS:
+            table[col] = parse_stored_dates(table[col])
+        return table
+
+
+def build_digest(table, today):
+    # Digest per approver (Approval 1..4): hanya yang Overdue atau mendekati Due Date
+    due = table[table["Reminder Status"].isin(DIGEST_STATUSES)]
+    approvers = {}
+    for approver, rows in due.groupby("Approver", sort=True):
+        approvers[approver] = [
+            {
+                "No": int(row["No"]),
+                "Well Name": row["Well Name"],
+                "Well Program Name": row["Well Program Name"],
+                "Program No": row["Program No"],
+                "Due Date": "" if pd.isna(row["Due Date"]) else row["Due Date"].strftime(STORED_DATE_FORMAT),
+                "Reminder Status": row["Reminder Status"],
+            }
+            for row in rows.to_dict("records")
+        ]
+    return {"date": pd.Timestamp(today).strftime(STORED_DATE_FORMAT), "approvers": approvers}
+
+
+def write_digest(digest, outbox=OUTBOX_DIR):
+    # Tulis ke file sementara lalu rename atomik agar notifier tidak membaca file setengah jadi
+    os.makedirs(outbox, exist_ok=True)
+    filename = f"reminder-digest-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.json"
+    path = os.path.join(outbox, filename)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(digest, f, ensure_ascii=False, indent=2, default=str)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+
+def refresh_reminders(storage, store, today=None, approaching_days=REMINDER_APPROACHING_DAYS, outbox=OUTBOX_DIR):
+    # Hitung ulang hanya jika data, tanggal atau batas hari berubah; digest hanya jika isinya berubah
+    today = today or datetime.today()
+    signature = storage.signature()
+    if store.is_current(signature, today, approaching_days):
+        return False
+    table = build_reminder_table(apply_schema(storage.query(columns=SOURCE_COLUMNS)), today, approaching_days)
+    digest = build_digest(table, today)
+    digest_key = hashlib.sha256(json.dumps(digest, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    state = store.state()
+    if digest["approvers"] and (state is None or state["digest_key"] != digest_key):
+        write_digest(digest, outbox)
+    store.replace(table, signature, today, approaching_days, digest_key)
+    return True
+
+
+class ReminderScheduler(threading.Thread):
+    # Thread latar: cek berkala (atau segera setelah notify) dan hitung ulang pengingat bila perlu
+
+    def __init__(self, storage, store, interval=REMINDER_INTERVAL, approaching_days=REMINDER_APPROACHING_DAYS,
+                 outbox=OUTBOX_DIR):
+        super().__init__(name="reminder-scheduler", daemon=True)
+        self.storage = storage
+        self.store = store
+        self.interval = interval
+        self.approaching_days = approaching_days
+        self.outbox = outbox
+        self.last_error = None
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+
+    def notify(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def run(self):
+        while not self._stopped.is_set():
+            try:
+                refresh_reminders(self.storage, self.store, approaching_days=self.approaching_days, outbox=self.outbox)
+                self.last_error = None
+            except Exception as e:
+                # Dicatat ke log dan ditampilkan di Report Statistik; siklus berikutnya mencoba lagi
+                logger.exception("Penjadwal pengingat gagal")
+                self.last_error = f"{datetime.now().isoformat(timespec='seconds')}: {e}"
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Penjadwal pengingat Due Date Well Program (headless)")
+    parser.add_argument("--backend", default=STORAGE_BACKEND, choices=["sqlite", "excel", "parquet"])
+    parser.add_argument("--interval", type=int, default=REMINDER_INTERVAL, help="detik antar pengecekan")
+    parser.add_argument("--approaching-days", type=int, default=REMINDER_APPROACHING_DAYS)
+    parser.add_argument("--outbox", default=OUTBOX_DIR)
+    parser.add_argument("--once", action="store_true", help="hitung sekali lalu keluar")
+    args = parser.parse_args()
+
+    storage = open_storage(args.backend)
+    store = ReminderStore()
+    while True:
+        updated = refresh_reminders(storage, store, approaching_days=args.approaching_days, outbox=args.outbox)
+        print(f"{datetime.now().isoformat(timespec='seconds')} pengingat {'diperbarui' if updated else 'tetap'}")
+        if args.once:
+            break
+        time.sleep(args.interval)
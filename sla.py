@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+from well_program_core import APPROVAL_AT_COLUMNS, APPROVAL_COLUMNS
+
+# Kelompok umur backlog (hari sejak program dibuat, atau sejak approval dikosongkan)
+AGING_EDGES = [7, 14, 30, 60]
+AGING_LABELS = ["0-7 hari", "8-14 hari", "15-30 hari", "31-60 hari", "> 60 hari"]
+CYCLE_TIME_QUANTILE = 0.9
+COMPLETED_LABEL = "Selesai (4 approval)"
+_DAY_NS = 86400 * 10 ** 9
+
+
+def _days(values):
+    # datetime64 -> jumlah hari (float) sejak epoch, NaT -> NaN; dipakai agar semua hitungan tetap vektor
+    values = pd.Series(values).astype("datetime64[ns]")
+    days = values.to_numpy().astype("int64").astype(float) / _DAY_NS
+    days[values.isna().to_numpy()] = np.nan
+    return days
+
+
+def approval_events(df):
+    # Satu baris per approval yang terisi dan tercatat waktunya.
+    # Stage Days: sejak tahap sebelumnya (atau Creation Date) selesai; Total Days: sejak Creation Date
+    created = _days(df["Creation Date"])
+    stage_start = created.copy()
+    frames = []
+    for col, at_col in zip(APPROVAL_COLUMNS, APPROVAL_AT_COLUMNS):
+        approved_at = _days(df[at_col])
+        approvers = df[col].astype(object).to_numpy()
+        done = (approvers != "") & ~np.isnan(approved_at) & ~np.isnan(created)
+        frames.append(pd.DataFrame({
+            "Stage": col,
+            "Approver": approvers[done],
+            "Stage Days": np.maximum(approved_at[done] - stage_start[done], 0),
+            "Total Days": np.maximum(approved_at[done] - created[done], 0),
+            "Approved At": df[at_col].to_numpy()[done],
+        }))
+        stage_start = np.fmax(stage_start, np.where(done, approved_at, np.nan))
+    return pd.concat(frames, ignore_index=True)
+
+
+def cycle_time_summary(events, by):
+    # Jumlah, median dan p90 lama tahap (hari) per kelompok
+    grouped = events.groupby(by, sort=True)["Stage Days"]
+    summary = pd.DataFrame({
+        "Jumlah": grouped.size(),
+        "Median (hari)": grouped.median(),
+        "P90 (hari)": grouped.quantile(CYCLE_TIME_QUANTILE),
+    })
+    return summary.round(1).reset_index()
+
+
+def backlog_aging(df, today):
+    # Approval yang masih kosong per tahap, dikelompokkan menurut umurnya
+    now = _days([pd.Timestamp(today)])[0]
+    created = _days(df["Creation Date"])
+    counts = {}
+    for col, at_col in zip(APPROVAL_COLUMNS, APPROVAL_AT_COLUMNS):
+        pending = df[col].astype(object).to_numpy() == ""
+        # Approval yang dikosongkan kembali dihitung sejak waktu dikosongkan
+        since = np.fmax(created, _days(df[at_col]))[pending]
+        ages = now - since[~np.isnan(since)]
+        counts[col] = np.bincount(np.digitize(ages, AGING_EDGES, right=True), minlength=len(AGING_LABELS))
+    aging = pd.DataFrame.from_dict(counts, orient="index", columns=AGING_LABELS)
+    return aging.rename_axis("Stage").reset_index()
+
+
+def monthly_throughput(df, events):
+    # Jumlah approval per bulan (menurut waktu approval) per tahap, plus program yang selesai.
+    # Dikelompokkan per Period bulanan; hanya indeks hasil (satu per bulan) yang diformat ke "YYYY-MM"
+    months = pd.Series(events["Approved At"], index=events.index).astype("datetime64[ns]").dt.to_period("M")
+    throughput = events.assign(Month=months).groupby(["Month", "Stage"]).size().unstack(fill_value=0)
+    throughput = throughput.reindex(columns=APPROVAL_COLUMNS, fill_value=0)
+    # Program selesai: keempat approval terisi dan tercatat; bulan = approval terakhir
+    approved_at = df[APPROVAL_AT_COLUMNS].astype("datetime64[ns]")
+    complete = (df[APPROVAL_COLUMNS].astype(object) != "").all(axis=1) & approved_at.notna().all(axis=1)
+    completed = approved_at[complete].max(axis=1).dt.to_period("M").value_counts()
+    throughput = throughput.join(completed.rename(COMPLETED_LABEL), how="outer").fillna(0).astype(int)
+    throughput = throughput.sort_index()
+    throughput.index = pd.PeriodIndex(throughput.index, freq="M").strftime("%Y-%m")
+    return throughput.rename_axis("Month").reset_index()
+
+
+def compute_sla(df, today):
+    events = approval_events(df)
+    return {
+        "events": len(events),
+        "stage_cycle": cycle_time_summary(events, "Stage"),
+        "approver_cycle": cycle_time_summary(events, "Approver"),
+        "aging": backlog_aging(df, today),
+        "throughput": monthly_throughput(df, events),
+    }
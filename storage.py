@@ -0,0 +1,846 @@
+import os
+import shutil
+import sqlite3
+import logging
+import argparse
+import tempfile
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import date, datetime
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import parquet_snapshot
+from journal import Journal
+from well_program_core import (
+    APPROVAL_AT_COLUMNS, APPROVAL_TIMESTAMP_FORMAT, CATEGORY_COLUMNS, DATE_COLUMNS, KEY_COLUMN, STORED_COLUMNS,
+    VERSION_COLUMN
+)
+
+TABLE_NAME = "well_programs"
+# Kolom yang diindeks di SQLite (lookup, filter status, pengingat due date)
+INDEXED_COLUMNS = ["Program No", "Status", "Due Date"]
+
+# Tanggal disimpan ISO di SQLite; format lama "%d-%b-%y" masih dibaca
+STORED_DATE_FORMAT = "%Y-%m-%d"
+LEGACY_DATE_FORMAT = "%d-%b-%y"
+
+# Snapshot Excel: sheet data + sheet meta berisi seq journal terakhir yang sudah dilipat
+# dan No terbesar yang pernah dipakai (No tidak dipakai ulang setelah hapus)
+DATA_SHEET = "data"
+META_SHEET = "_meta"
+# Kompaksi otomatis (di thread latar) setelah sekian entri journal
+JOURNAL_COMPACT_THRESHOLD = int(os.environ.get("WPM_JOURNAL_COMPACT_THRESHOLD", "500"))
+
+logger = logging.getLogger(__name__)
+
+
+# Signature data tepat sebelum dan sesudah satu penulisan, diambil di dalam transaksi/kunci yang sama.
+# before == signature yang dibaca pemanggil berarti tidak ada penulisan lain di antaranya
+Change = namedtuple("Change", ["before", "after"])
+
+
+class ConflictError(Exception):
+    # Baris sudah diubah/dihapus pengguna lain sejak dibaca (compare-and-swap gagal)
+    pass
+
+
+@contextmanager
+def file_lock(path, exclusive=True):
+    # Kunci antar-proses pada file .lock; kunci bersama (baca) tidak saling menunggu
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        else:
+            # msvcrt hanya punya kunci eksklusif
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _to_db_value(value, column=None):
+    # Konversi nilai pandas/numpy ke tipe yang dimengerti sqlite3.
+    # Waktu approval disimpan lengkap dengan jam (datetime adalah subclass date, jadi dicek lebih dulu)
+    if value is None:
+        return None
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    if column in APPROVAL_AT_COLUMNS and isinstance(value, datetime):
+        return value.strftime(APPROVAL_TIMESTAMP_FORMAT)
+    if isinstance(value, date):
+        return value.strftime(STORED_DATE_FORMAT)
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def normalize_frame(df, columns):
+    # Pastikan semua kolom ada dan kolom teks tidak berisi NaN; kolom bertipe tanggal dibiarkan (NaT tetap NaT)
+    for col in columns:
+        if col not in df.columns:
+            df[col] = ""
+    text_columns = [col for col in columns
+                    if col != KEY_COLUMN and not pd.api.types.is_datetime64_any_dtype(df[col])]
+    df[text_columns] = df[text_columns].astype(object).where(df[text_columns].notna(), "")
+    return df
+
+
+def parse_stored_dates(values):
+    # Parse sekali per kolom: ISO dulu, lalu format lama, lalu format campuran
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype("datetime64[ns]")
+    text = values.astype(object).where(values.notna(), "")
+    filled = text != ""
+    parsed = pd.to_datetime(text, format=STORED_DATE_FORMAT, errors="coerce")
+    for date_format in (LEGACY_DATE_FORMAT, "mixed"):
+        remaining = parsed.isna() & filled
+        if not remaining.any():
+            break
+        parsed[remaining] = pd.to_datetime(text[remaining], format=date_format, errors="coerce")
+    return parsed.astype("datetime64[ns]")
+
+
+def parse_stored_timestamps(values):
+    # Waktu approval disimpan sebagai teks ISO; kosong -> NaT
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype("datetime64[ns]")
+    text = values.astype(object).where(values.notna(), "")
+    return pd.to_datetime(text, format=APPROVAL_TIMESTAMP_FORMAT, errors="coerce").astype("datetime64[ns]")
+
+
+def apply_schema(df):
+    # Konversi tipe sekali saat load; format tampilan dilakukan di UI
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = parse_stored_dates(df[col])
+    for col in APPROVAL_AT_COLUMNS:
+        if col in df.columns:
+            df[col] = parse_stored_timestamps(df[col])
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def export_excel(df, target):
+    # Excel tetap dipakai sebagai format ekspor (path atau buffer); kolom internal tidak ikut
+    df.drop(columns=[VERSION_COLUMN] + APPROVAL_AT_COLUMNS, errors="ignore").to_excel(target, index=False)
+
+
+class StorageBackend:
+    # Antarmuka penyimpanan: load, insert, update, delete dan query
+
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = list(columns)
+
+    @property
+    def data_columns(self):
+        return [col for col in self.columns if col != KEY_COLUMN]
+
+    def signature(self):
+        # Nilai yang berubah setiap kali data berubah (dipakai sebagai kunci cache)
+        raise NotImplementedError
+
+    def load(self):
+        raise NotImplementedError
+
+    def last_no(self):
+        # No terbesar yang pernah dipakai (termasuk yang sudah dihapus)
+        raise NotImplementedError
+
+    def insert(self, record):
+        # -> (No baru, Change)
+        raise NotImplementedError
+
+    def insert_many(self, df):
+        raise NotImplementedError
+
+    def update(self, no, record, expected_version=None):
+        # -> (jumlah baris, Change)
+        raise NotImplementedError
+
+    def delete(self, no, expected_version=None):
+        # -> (jumlah baris, Change)
+        raise NotImplementedError
+
+    @staticmethod
+    def _check_version(no, current_version, expected_version):
+        # expected_version None: tanpa pengecekan (perilaku lama)
+        if expected_version is None:
+            return
+        if current_version is None:
+            raise ConflictError(f"Data No {no} sudah dihapus oleh pengguna lain.")
+        if int(current_version) != int(expected_version):
+            raise ConflictError(f"Data No {no} sudah diubah oleh pengguna lain. Muat ulang data lalu coba lagi.")
+
+    @staticmethod
+    def _filter_frame(df, filters, columns):
+        # filters: {kolom: nilai} atau {kolom: [nilai, ...]}
+        mask = pd.Series(True, index=df.index)
+        for col, value in (filters or {}).items():
+            if isinstance(value, (list, tuple, set)):
+                mask &= df[col].isin(list(value))
+            else:
+                mask &= df[col] == value
+        result = df[mask]
+        return result[columns] if columns else result
+
+    def query(self, filters=None, columns=None):
+        return self._filter_frame(self.load(), filters, columns)
+
+
+class JournaledStorage(StorageBackend):
+    # Snapshot + journal append-only: setiap perubahan hanya menambah satu baris journal,
+    # snapshot ditulis ulang hanya saat kompaksi. Penulisan antar-proses dikunci lewat file .lock.
+    # Di memori: snapshot sebagai DataFrame bertipe + baris yang diubah journal (No -> baris, None = dihapus).
+    # Subkelas menentukan format snapshot (_snapshot_exists, _file_signature, _read/_write_snapshot_file)
+
+    def __init__(self, path, columns, journal_path=None, compact_threshold=JOURNAL_COMPACT_THRESHOLD):
+        super().__init__(path, columns)
+        self.journal = Journal(journal_path or os.path.splitext(path)[0] + ".journal.jsonl")
+        self.lock_path = os.path.splitext(path)[0] + ".lock"
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()
+        self._file_locked = False
+        self._snapshot_signature = None
+        self._base = apply_schema(pd.DataFrame(columns=self.columns + [VERSION_COLUMN]))
+        self._base_positions = {}
+        self._pending = {}
+        self._max_no = 0
+        self._seq = 0
+        self._journal_offset = 0
+        self._journal_entries = 0
+        self._compactor = None
+        with self._locked(exclusive=True):
+            if not self._snapshot_exists():
+                self._write_snapshot(pd.DataFrame(columns=self.columns), 0, 0)
+
+    @contextmanager
+    def _locked(self, exclusive=False):
+        # RLock untuk thread di proses ini, file lock untuk proses lain (tidak bersarang).
+        # Pembaca hanya memegangnya selama sinkronisasi state; membangun DataFrame dilakukan di luar kunci
+        with self._lock:
+            if self._file_locked:
+                yield
+                return
+            with file_lock(self.lock_path, exclusive):
+                self._file_locked = True
+                try:
+                    yield
+                finally:
+                    self._file_locked = False
+
+    def _snapshot_exists(self):
+        raise NotImplementedError
+
+    def _file_signature(self):
+        raise NotImplementedError
+
+    def _read_snapshot_file(self):
+        # -> (DataFrame, seq journal terakhir yang sudah dilipat, No terbesar yang pernah dipakai)
+        raise NotImplementedError
+
+    def _write_snapshot_file(self, df, seq, last_no):
+        raise NotImplementedError
+
+    def signature(self):
+        return self._file_signature(), self.journal.size()
+
+    def _read_snapshot(self):
+        df, seq, last_no = self._read_snapshot_file()
+        # Migrasi struktur: tambahkan kolom yang belum ada, tulis sekali saja
+        missing_columns = [col for col in self.columns + [VERSION_COLUMN] if col not in df.columns]
+        df = normalize_frame(df, self.columns)
+        if VERSION_COLUMN not in df.columns:
+            df[VERSION_COLUMN] = 1
+        df[VERSION_COLUMN] = df[VERSION_COLUMN].fillna(1).astype(int)
+        if missing_columns:
+            self._write_snapshot(df, seq, last_no)
+        return df, seq, last_no
+
+    def _write_snapshot(self, df, seq, last_no):
+        df = df.reindex(columns=self.columns + [VERSION_COLUMN])
+        df[VERSION_COLUMN] = df[VERSION_COLUMN].fillna(1).astype(int)
+        for col in DATE_COLUMNS:
+            df[col] = parse_stored_dates(df[col])
+        for col in APPROVAL_AT_COLUMNS:
+            if col in df.columns:
+                df[col] = parse_stored_timestamps(df[col]).dt.strftime(APPROVAL_TIMESTAMP_FORMAT).fillna("")
+        self._write_snapshot_file(df, seq, last_no)
+
+    def _refresh(self):
+        # Muat ulang snapshot hanya jika berubah, lalu replay entri journal yang belum diterapkan
+        if self._file_signature() != self._snapshot_signature:
+            df, seq, last_no = self._read_snapshot()
+            self._set_base(df)
+            self._max_no = max(last_no, max(self._base_positions, default=0))
+            self._seq = seq
+            self._journal_offset = 0
+            self._journal_entries = 0
+            self._snapshot_signature = self._file_signature()
+        entries, self._journal_offset = self.journal.read(self._journal_offset)
+        for entry in entries:
+            if entry["seq"] <= self._seq:
+                continue
+            self._apply(entry)
+            self._seq = entry["seq"]
+            self._journal_entries += 1
+
+    def _set_base(self, df):
+        # Snapshot disimpan bertipe dan urut No; tidak pernah diubah di tempat (pembaca memegang referensinya)
+        df = df.reindex(columns=self.columns + [VERSION_COLUMN])
+        df[KEY_COLUMN] = df[KEY_COLUMN].astype(int)
+        if not df[KEY_COLUMN].is_monotonic_increasing:
+            df = df.sort_values(KEY_COLUMN, kind="stable")
+        self._base = apply_schema(df.reset_index(drop=True))
+        self._base_positions = dict(zip(self._base[KEY_COLUMN].tolist(), range(len(self._base))))
+        self._pending = {}
+
+    def _row(self, no):
+        # Baris terkini (dict nilai polos seperti di journal), atau None jika tidak ada / sudah dihapus
+        if no in self._pending:
+            return self._pending[no]
+        position = self._base_positions.get(no)
+        if position is None:
+            return None
+        row = self._base.iloc[position]
+        record = self._plain_record(row)
+        record[KEY_COLUMN] = no
+        record[VERSION_COLUMN] = int(row[VERSION_COLUMN])
+        return record
+
+    def _apply(self, entry):
+        op = entry["op"]
+        if op == "insert":
+            self._add_records(entry["no"], [entry["record"]])
+        elif op == "insert_many":
+            self._add_records(entry["no"], entry["records"])
+        elif op == "update":
+            record = self._row(entry["no"])
+            if record is not None:
+                # Dict baru, bukan diubah di tempat: salinan perubahan milik pembaca tetap konsisten
+                updated = dict(record, **entry["record"])
+                updated[VERSION_COLUMN] = record.get(VERSION_COLUMN, 1) + 1
+                self._pending[entry["no"]] = updated
+        elif op == "delete":
+            # No baris lain tetap; _max_no tidak turun agar No yang dihapus tidak dipakai ulang
+            if self._row(entry["no"]) is not None:
+                self._pending[entry["no"]] = None
+
+    def _add_records(self, start, records):
+        for offset, record in enumerate(records):
+            no = start + offset
+            row = {col: record.get(col, "") for col in self.data_columns}
+            row[KEY_COLUMN] = no
+            row[VERSION_COLUMN] = 1
+            self._pending[no] = row
+            self._max_no = max(self._max_no, no)
+
+    def _append(self, op, **payload):
+        with self._locked(exclusive=True):
+            self._refresh()
+            entry = {"seq": self._seq + 1, "op": op}
+            entry.update(payload)
+            self.journal.append(entry)
+            self._refresh()
+            if self._journal_entries >= self.compact_threshold:
+                self._compact_in_background()
+            return entry
+
+    def _compact_in_background(self):
+        # Penyimpanan pengguna tidak ikut menunggu penulisan ulang snapshot; satu thread per instance.
+        # Dipanggil di bawah kunci tulis, jadi thread baru menunggu sampai penulisan ini selesai
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self._background_compact, name="journal-compactor", daemon=True)
+        self._compactor.start()
+
+    def _background_compact(self):
+        try:
+            self.compact()
+        except Exception:
+            # Journal tetap utuh; kompaksi dicoba lagi pada penulisan berikutnya
+            logger.exception("Kompaksi journal %s gagal", self.journal.path)
+
+    def _plain_record(self, record):
+        # Nilai yang bisa diserialisasi ke JSON (tanggal -> ISO, NaN -> "")
+        plain = {}
+        for col in self.data_columns:
+            if col in record:
+                value = _to_db_value(record[col], col)
+                plain[col] = "" if value is None else value
+        return plain
+
+    def _frame(self, base=None, pending=None):
+        # Snapshot + perubahan journal sebagai satu tabel bertipe, urut No.
+        # Tanpa perubahan tertunda: salinan snapshot; selain itu baris yang berubah diganti sekaligus (vektor)
+        base = self._base if base is None else base
+        pending = self._pending if pending is None else pending
+        if not pending:
+            return base.copy()
+        kept = base[~base[KEY_COLUMN].isin(list(pending))]
+        rows = [record for record in pending.values() if record is not None]
+        if not rows:
+            return kept.reset_index(drop=True)
+        changed = normalize_frame(pd.DataFrame(rows, columns=self.columns + [VERSION_COLUMN]), self.columns)
+        df = pd.concat([kept, apply_schema(changed)], ignore_index=True)
+        # Baris yang diubah kembali ke posisinya, baris baru (No terbesar) di akhir; kategori disatukan lagi
+        return apply_schema(df.sort_values(KEY_COLUMN, kind="stable", ignore_index=True))
+
+    def load(self):
+        # Di bawah kunci hanya replay journal dan salin referensi state; sesi lain tidak menunggu pembangunan tabel
+        with self._locked():
+            self._refresh()
+            base, pending = self._base, dict(self._pending)
+        return self._frame(base, pending)
+
+    def last_no(self):
+        with self._locked():
+            self._refresh()
+            return self._max_no
+
+    def insert(self, record):
+        with self._locked(exclusive=True):
+            self._refresh()
+            before = self.signature()
+            new_no = self._max_no + 1
+            self._append("insert", no=new_no, record=self._plain_record(record))
+            return new_no, Change(before, self.signature())
+
+    def insert_many(self, df_new):
+        df_new = normalize_frame(df_new.copy(), self.columns)
+        records = [self._plain_record(record) for record in df_new[self.data_columns].to_dict("records")]
+        with self._locked(exclusive=True):
+            self._refresh()
+            self._append("insert_many", no=self._max_no + 1, records=records)
+        return len(records)
+
+    def _current_version(self, no):
+        record = self._row(int(no))
+        return None if record is None else record[VERSION_COLUMN]
+
+    def update(self, no, record, expected_version=None):
+        # Cek versi dan tulis journal di bawah kunci yang sama (compare-and-swap)
+        with self._locked(exclusive=True):
+            self._refresh()
+            self._check_version(no, self._current_version(no), expected_version)
+            before = self.signature()
+            if self._row(int(no)) is None:
+                return 0, Change(before, before)
+            self._append("update", no=int(no), record=self._plain_record(record))
+            return 1, Change(before, self.signature())
+
+    def delete(self, no, expected_version=None):
+        with self._locked(exclusive=True):
+            self._refresh()
+            self._check_version(no, self._current_version(no), expected_version)
+            before = self.signature()
+            if self._row(int(no)) is None:
+                return 0, Change(before, before)
+            self._append("delete", no=int(no))
+            return 1, Change(before, self.signature())
+
+    def compact(self):
+        # Lipat journal ke snapshot baru (rename atomik), lalu buang entri yang sudah masuk snapshot
+        with self._locked(exclusive=True):
+            self._refresh()
+            seq = self._seq
+            df = self._frame()
+            self._write_snapshot(df, seq, self._max_no)
+            # Tabel yang baru ditulis langsung menjadi snapshot di memori, tanpa dibaca ulang
+            self._set_base(df)
+            self.journal.truncate_through(seq)
+            self._snapshot_signature = self._file_signature()
+            self._journal_offset = 0
+            self._journal_entries = 0
+            return seq
+
+
+def read_workbook(path):
+    # -> (DataFrame, seq, last_no); workbook lama tanpa sheet meta: seq dan last_no 0. Hanya membaca
+    sheets = pd.read_excel(path, sheet_name=None)
+    df = sheets.get(DATA_SHEET, next(iter(sheets.values())))
+    meta = sheets.get(META_SHEET)
+    has_meta = meta is not None and not meta.empty
+    seq = int(meta["seq"].iloc[0]) if has_meta else 0
+    last_no = int(meta["last_no"].iloc[0]) if has_meta and "last_no" in meta.columns else 0
+    return df, seq, last_no
+
+
+class ExcelStorage(JournaledStorage):
+    # Snapshot berupa workbook Excel: sheet data + sheet meta
+
+    def _snapshot_exists(self):
+        return os.path.exists(self.path)
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_snapshot_file(self):
+        return read_workbook(self.path)
+
+    def _write_snapshot_file(self, df, seq, last_no):
+        # Tulis ke file sementara lalu rename atomik; tanggal ditulis sebagai sel tanggal Excel
+        base, ext = os.path.splitext(self.path)
+        # Nama sementara per proses: migrasi struktur bisa terjadi saat load di bawah kunci bersama
+        tmp_path = f"{base}.tmp{os.getpid()}{ext}"
+        with pd.ExcelWriter(tmp_path, engine="openpyxl") as writer:
+            df.to_excel(writer, sheet_name=DATA_SHEET, index=False)
+            pd.DataFrame({"seq": [seq], "last_no": [last_no]}).to_excel(writer, sheet_name=META_SHEET, index=False)
+        with open(tmp_path, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+class ParquetStorage(JournaledStorage):
+    # Snapshot Parquet berversi (lihat parquet_snapshot): INPROGRESS sebagai partisi aktif,
+    # COMPLETED dipartisi per bulan Creation Date; dibaca dengan memory map
+
+    def _snapshot_exists(self):
+        return parquet_snapshot.current_version(self.path) is not None
+
+    def _file_signature(self):
+        return parquet_snapshot.current_version(self.path)
+
+    def _read_snapshot_file(self):
+        df, manifest = parquet_snapshot.read_snapshot(self.path)
+        return df, manifest["seq"], manifest["last_no"]
+
+    def _write_snapshot_file(self, df, seq, last_no):
+        parquet_snapshot.write_snapshot(self.path, df, seq, last_no)
+
+    def query(self, filters=None, columns=None):
+        # Tanpa entri journal tertunda: baca langsung dari snapshot, hanya kolom dan partisi yang dibutuhkan
+        # (Status INPROGRESS -> partisi aktif saja, COMPLETED -> partisi riwayat saja)
+        filters = filters or {}
+        with self._locked():
+            pending = self.journal.size() > 0
+            # Folder versi tidak diubah setelah ditulis dan beberapa versi lama disimpan,
+            # jadi versi yang dipilih di bawah kunci aman dibaca setelah kunci dilepas
+            version = parquet_snapshot.current_version(self.path)
+        if pending:
+            return super().query(filters, columns)
+        statuses = filters.get("Status")
+        if statuses is not None and not isinstance(statuses, (list, tuple, set)):
+            statuses = [statuses]
+        active = statuses is None or parquet_snapshot.ACTIVE_STATUS in statuses
+        history = statuses is None or any(status != parquet_snapshot.ACTIVE_STATUS for status in statuses)
+        read_columns = None
+        if columns:
+            read_columns = list(columns) + [col for col in filters if col not in columns]
+        df, _ = parquet_snapshot.read_snapshot(
+            self.path, read_columns, active=active, history=history, version=version
+        )
+        return self._filter_frame(apply_schema(df), filters, columns)
+
+    def read_history(self, months=None, columns=None):
+        # Riwayat COMPLETED per bulan "YYYY-MM"; entri journal tertunda dilipat dulu ke snapshot
+        if self.journal.size() > 0:
+            self.compact()
+        with self._locked():
+            version = parquet_snapshot.current_version(self.path)
+        df, _ = parquet_snapshot.read_snapshot(self.path, columns, active=False, months=months, version=version)
+        return apply_schema(df)
+
+
+class SQLiteStorage(StorageBackend):
+    # Backend SQLite: penulisan per baris dalam transaksi, indeks pada kolom pencarian
+
+    def __init__(self, path, columns):
+        super().__init__(path, columns)
+        self._create_schema()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout = 30000")
+        return conn
+
+    @contextmanager
+    def _transaction(self, bump_version=True):
+        # BEGIN IMMEDIATE: kunci tulis diambil di awal agar penomoran No tidak balapan.
+        # bump_version=False: pemanggil sendiri yang menaikkan versi, hanya jika data benar-benar berubah
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            if bump_version:
+                self._bump_version(conn)
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def _create_schema(self):
+        column_defs = [f"{_quote(KEY_COLUMN)} INTEGER NOT NULL"]
+        column_defs += [f"{_quote(col)} TEXT NOT NULL DEFAULT ''" for col in self.data_columns]
+        column_defs.append(f"{_quote(VERSION_COLUMN)} INTEGER NOT NULL DEFAULT 1")
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {TABLE_NAME} ({', '.join(column_defs)})")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (version INTEGER NOT NULL, last_no INTEGER NOT NULL DEFAULT 0)"
+            )
+            if conn.execute("SELECT COUNT(*) FROM meta").fetchone()[0] == 0:
+                conn.execute("INSERT INTO meta (version) VALUES (0)")
+            table_columns = [row[1] for row in conn.execute(f"PRAGMA table_info({TABLE_NAME})")]
+            # Kolom baru mengubah hasil load, jadi ikut menaikkan versi (sekali saja, saat upgrade)
+            altered = any(col not in table_columns for col in self.data_columns + [VERSION_COLUMN])
+            if VERSION_COLUMN not in table_columns:
+                conn.execute(
+                    f"ALTER TABLE {TABLE_NAME} ADD COLUMN {_quote(VERSION_COLUMN)} INTEGER NOT NULL DEFAULT 1"
+                )
+            # Migrasi struktur: kolom data baru (mis. waktu approval) ditambahkan ke tabel lama
+            for col in self.data_columns:
+                if col not in table_columns:
+                    conn.execute(f"ALTER TABLE {TABLE_NAME} ADD COLUMN {_quote(col)} TEXT NOT NULL DEFAULT ''")
+            meta_columns = [row[1] for row in conn.execute("PRAGMA table_info(meta)")]
+            if "last_no" not in meta_columns:
+                # Database lama: No terbesar saat ini menjadi titik awal penomoran
+                conn.execute("ALTER TABLE meta ADD COLUMN last_no INTEGER NOT NULL DEFAULT 0")
+                conn.execute(
+                    f"UPDATE meta SET last_no = (SELECT COALESCE(MAX({_quote(KEY_COLUMN)}), 0) FROM {TABLE_NAME})"
+                )
+            # No stabil dan unik (tidak ada lagi penomoran ulang saat hapus)
+            conn.execute("DROP INDEX IF EXISTS idx_no")
+            conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_no_unique ON {TABLE_NAME} ({_quote(KEY_COLUMN)})")
+            for col in INDEXED_COLUMNS:
+                index_name = "idx_" + col.lower().replace(" ", "_")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {TABLE_NAME} ({_quote(col)})")
+        finally:
+            conn.close()
+        # Membuka storage tidak boleh mengubah signature (cache semua sesi ikut kedaluwarsa);
+        # versi hanya naik jika struktur atau tanggal lama benar-benar diubah
+        with self._transaction(bump_version=False) as conn:
+            if self._upgrade_dates(conn) or altered:
+                self._bump_version(conn)
+
+    @staticmethod
+    def _bump_version(conn):
+        conn.execute("UPDATE meta SET version = version + 1")
+
+    @staticmethod
+    def _version(conn):
+        return conn.execute("SELECT version FROM meta").fetchone()[0]
+
+    @classmethod
+    def _change(cls, conn):
+        # Dipanggil di dalam _transaction: versi naik tepat satu saat COMMIT
+        before = cls._version(conn)
+        return Change(before, before + 1)
+
+    def signature(self):
+        conn = self._connect()
+        try:
+            return self._version(conn)
+        finally:
+            conn.close()
+
+    def _upgrade_dates(self, conn):
+        # Konversi satu kali tanggal lama "%d-%b-%y" ke ISO agar indeks Due Date terurut; -> jumlah nilai diubah
+        upgraded = 0
+        for col in DATE_COLUMNS:
+            rows = conn.execute(
+                f"SELECT rowid, {_quote(col)} FROM {TABLE_NAME} "
+                f"WHERE {_quote(col)} != '' AND {_quote(col)} NOT GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'"
+            ).fetchall()
+            if not rows:
+                continue
+            parsed = parse_stored_dates([value for _, value in rows])
+            conn.executemany(
+                f"UPDATE {TABLE_NAME} SET {_quote(col)} = ? WHERE rowid = ?",
+                [("" if pd.isna(value) else value.strftime(STORED_DATE_FORMAT), rowid)
+                 for (rowid, _), value in zip(rows, parsed)]
+            )
+            upgraded += len(rows)
+        return upgraded
+
+    def load(self):
+        return apply_schema(self.query())
+
+    def query(self, filters=None, columns=None):
+        selected = columns or self.columns + [VERSION_COLUMN]
+        sql = f"SELECT {', '.join(_quote(col) for col in selected)} FROM {TABLE_NAME}"
+        clauses, params = [], []
+        for col, value in (filters or {}).items():
+            if isinstance(value, (list, tuple, set)):
+                value = list(value)
+                clauses.append(f"{_quote(col)} IN ({', '.join('?' for _ in value)})")
+                params.extend(_to_db_value(v) for v in value)
+            else:
+                clauses.append(f"{_quote(col)} = ?")
+                params.append(_to_db_value(value))
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {_quote(KEY_COLUMN)}"
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(sql, conn, params=params)
+        finally:
+            conn.close()
+
+    def _row_values(self, record, columns=None):
+        values = []
+        for col in columns or self.data_columns:
+            value = _to_db_value(record.get(col), col)
+            values.append("" if value is None else value)
+        return values
+
+    def _insert_sql(self):
+        columns = [KEY_COLUMN] + self.data_columns
+        return (f"INSERT INTO {TABLE_NAME} ({', '.join(_quote(col) for col in columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})")
+
+    def _next_no(self, conn):
+        # No baru = No terbesar yang pernah dipakai + 1 (No yang dihapus tidak dipakai ulang)
+        return conn.execute(
+            f"SELECT MAX(last_no, (SELECT COALESCE(MAX({_quote(KEY_COLUMN)}), 0) FROM {TABLE_NAME})) + 1 FROM meta"
+        ).fetchone()[0]
+
+    def _set_last_no(self, conn, last_no):
+        conn.execute("UPDATE meta SET last_no = MAX(last_no, ?)", [int(last_no)])
+
+    def last_no(self):
+        conn = self._connect()
+        try:
+            return self._next_no(conn) - 1
+        finally:
+            conn.close()
+
+    def insert(self, record):
+        with self._transaction() as conn:
+            change = self._change(conn)
+            new_no = self._next_no(conn)
+            conn.execute(self._insert_sql(), [new_no] + self._row_values(record))
+            self._set_last_no(conn, new_no)
+        return new_no, change
+
+    def insert_many(self, df_new, keep_no=False, last_no=None):
+        # keep_no: pakai No dari data sumber (migrasi) agar referensi ke No tidak berubah;
+        # last_no: No terbesar yang pernah dipakai di sumber, agar No yang sudah dihapus tidak dipakai ulang
+        df_new = df_new.copy()
+        for col in DATE_COLUMNS:
+            if col in df_new.columns:
+                df_new[col] = parse_stored_dates(df_new[col])
+        df_new = normalize_frame(df_new, self.columns)
+        records = df_new[self.data_columns].to_dict("records")
+        with self._transaction() as conn:
+            if keep_no:
+                nos = [int(no) for no in df_new[KEY_COLUMN]]
+            else:
+                start = self._next_no(conn)
+                nos = range(start, start + len(records))
+            conn.executemany(
+                self._insert_sql(),
+                ([no] + self._row_values(record) for no, record in zip(nos, records))
+            )
+            if records:
+                self._set_last_no(conn, max(nos))
+            if last_no is not None:
+                self._set_last_no(conn, last_no)
+        return len(records)
+
+    def _current_version(self, conn, no):
+        row = conn.execute(
+            f"SELECT {_quote(VERSION_COLUMN)} FROM {TABLE_NAME} WHERE {_quote(KEY_COLUMN)} = ?", [int(no)]
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def update(self, no, record, expected_version=None):
+        data_columns = [col for col in self.data_columns if col in record]
+        assignments = [f"{_quote(col)} = ?" for col in data_columns]
+        assignments.append(f"{_quote(VERSION_COLUMN)} = {_quote(VERSION_COLUMN)} + 1")
+        # Cek versi dan update dalam satu transaksi IMMEDIATE (compare-and-swap)
+        with self._transaction() as conn:
+            self._check_version(no, self._current_version(conn, no), expected_version)
+            change = self._change(conn)
+            cursor = conn.execute(
+                f"UPDATE {TABLE_NAME} SET {', '.join(assignments)} WHERE {_quote(KEY_COLUMN)} = ?",
+                self._row_values(record, data_columns) + [int(no)]
+            )
+        return cursor.rowcount, change
+
+    def delete(self, no, expected_version=None):
+        with self._transaction() as conn:
+            self._check_version(no, self._current_version(conn, no), expected_version)
+            change = self._change(conn)
+            # No baris lain tidak diubah: referensi luar ke No tetap valid
+            cursor = conn.execute(f"DELETE FROM {TABLE_NAME} WHERE {_quote(KEY_COLUMN)} = ?", [int(no)])
+        return cursor.rowcount, change
+
+
+def migrate_xlsx_to_sqlite(xlsx_path, db_path, columns=None):
+    # Migrasi satu kali dari workbook lama (termasuk journal yang belum dikompaksi) ke database SQLite.
+    # Sumber hanya dibaca: tidak ada migrasi struktur, journal atau file .lock yang ditulis di sebelahnya
+    df, seq, last_no = read_workbook(xlsx_path)
+    if columns is None:
+        columns = [KEY_COLUMN] + [col for col in df.columns if col not in (KEY_COLUMN, VERSION_COLUMN)]
+    journal_path = os.path.splitext(xlsx_path)[0] + ".journal.jsonl"
+    pending = os.path.exists(journal_path) and any(
+        entry.get("seq", 0) > seq for entry in Journal(journal_path).read()[0]
+    )
+    if pending:
+        # Replay journal memakai ExcelStorage pada salinan sementara; workbook dan journal asli tetap utuh
+        with tempfile.TemporaryDirectory() as directory:
+            copy_path = os.path.join(directory, os.path.basename(xlsx_path))
+            shutil.copy2(xlsx_path, copy_path)
+            shutil.copy2(journal_path, os.path.splitext(copy_path)[0] + ".journal.jsonl")
+            source = ExcelStorage(copy_path, columns)
+            df, last_no = source.load(), source.last_no()
+    else:
+        df = apply_schema(normalize_frame(df, columns))
+    storage = SQLiteStorage(db_path, columns)
+    if not storage.load().empty:
+        raise ValueError(f"Database {db_path} sudah berisi data, migrasi dibatalkan")
+    storage.insert_many(df, keep_no=True, last_no=last_no)
+    return len(df)
+
+
+def migrate_to_parquet(source, parquet_path, columns=None):
+    # Salin isi backend lain ke snapshot Parquet baru; No dan Version dipertahankan
+    df = source.load()
+    # No terbesar yang pernah dipakai di sumber, bukan No terbesar yang tersisa
+    last_no = max(source.last_no(), int(df[KEY_COLUMN].max()) if not df.empty else 0)
+    storage = ParquetStorage(parquet_path, columns or source.columns)
+    with storage._locked(exclusive=True):
+        if storage.load().shape[0] > 0:
+            raise ValueError(f"Snapshot {parquet_path} sudah berisi data, migrasi dibatalkan")
+        storage._write_snapshot(df, storage._seq, last_no)
+    return len(df)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrasi data Well Program dari Excel ke SQLite")
+    parser.add_argument("xlsx_path")
+    parser.add_argument("db_path")
+    args = parser.parse_args()
+    count = migrate_xlsx_to_sqlite(args.xlsx_path, args.db_path, STORED_COLUMNS)
+    print(f"{count} baris dimigrasikan ke {args.db_path}")
@@ -0,0 +1,360 @@
+import os
+import math
+import threading
+from datetime import datetime
+
+# Modul inti tanpa Streamlit/Plotly: bisa diimpor oleh job batch.
+# pandas/numpy diimpor di dalam fungsi agar impor modul ini tetap ringan.
+
+# File untuk menyimpan data
+DATA_FILE = "data/well_program_data.xlsx"
+DB_FILE = "data/well_program_data.db"
+PARQUET_DIR = "data/well_program_parquet"
+# Backend penyimpanan: "sqlite" (default), "excel" atau "parquet" (butuh pyarrow)
+STORAGE_BACKEND = os.environ.get("WPM_STORAGE", "sqlite")
+
+# Kolom yang diharapkan
+REQUIRED_COLUMNS = [
+    "No", "Well Name", "Well Program Name", "Program No", "Creation Date", "Due Date",
+    "Status", "Doc Initiator", "Approval 1", "Approval 2", "Approval 3", "Approval 4", "Remarks"
+]
+KEY_COLUMN = "No"
+# Kolom internal (tidak ditampilkan/diekspor): versi baris untuk compare-and-swap saat update/hapus
+VERSION_COLUMN = "Version"
+
+# Skema bertipe: tanggal sebagai datetime64[ns], kolom pilihan sebagai category
+DATE_COLUMNS = ["Creation Date", "Due Date"]
+CATEGORY_COLUMNS = ["Status", "Doc Initiator", "Approval 1", "Approval 2", "Approval 3", "Approval 4"]
+
+# Opsi valid untuk dropdown
+VALID_INITIATORS = ["DHARMAWAN RAHARJO", "R.AULIA MUHAMMAD RIZKY", "HIBAN"]
+VALID_APPROVAL1_2 = ["KRISTIANTO WIBOWO", "YULIANTO AGUS", ""]
+VALID_APPROVAL3 = ["BUDI RIVAI WIJAYA", ""]
+VALID_APPROVAL4 = ["PE TEAM", ""]
+VALID_STATUSES = ["COMPLETED", "INPROGRESS"]
+APPROVAL_COLUMNS = ["Approval 1", "Approval 2", "Approval 3", "Approval 4"]
+# Kolom internal: waktu terakhir Approval N diisi/dikosongkan lewat form (teks ISO, kosong jika tidak diketahui)
+APPROVAL_AT_COLUMNS = [f"{col} At" for col in APPROVAL_COLUMNS]
+APPROVAL_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+# Kolom yang disimpan storage; upload/ekspor tetap memakai REQUIRED_COLUMNS
+STORED_COLUMNS = REQUIRED_COLUMNS + APPROVAL_AT_COLUMNS
+# Kolom yang dibaca halaman Report Statistik (tanpa kolom internal Version)
+REPORT_COLUMNS = STORED_COLUMNS
+# Nilai approval yang dianggap "Sudah Diapprove" per kolom
+APPROVED_VALUES = {
+    "Approval 1": [value for value in VALID_APPROVAL1_2 if value],
+    "Approval 2": [value for value in VALID_APPROVAL1_2 if value],
+    "Approval 3": [value for value in VALID_APPROVAL3 if value],
+    "Approval 4": [value for value in VALID_APPROVAL4 if value],
+}
+
+# Opsi filter tabel Report Statistik
+FILTER_ALL = "Semua"
+UNAPPROVED = "Belum Diapprove"
+APPROVED = "Sudah Diapprove"
+FILTER_COLUMNS = ["Status"] + APPROVAL_COLUMNS
+STATUS_FILTER_OPTIONS = [FILTER_ALL] + VALID_STATUSES
+APPROVAL_FILTER_OPTIONS = [FILTER_ALL, UNAPPROVED, APPROVED]
+
+# Format tanggal hanya dipakai saat ditampilkan
+DISPLAY_DATE_FORMAT = "%d-%b-%y"
+
+# Batas hari sebelum Due Date untuk status "Approaching Due Date"
+REMINDER_APPROACHING_DAYS = int(os.environ.get("WPM_APPROACHING_DAYS", "3"))
+REMINDER_COLUMNS = [
+    "No", "Well Name", "Well Program Name", "Program No", "Approver",
+    "Creation Date", "Due Date", "Reminder Status", "Status"
+]
+
+
+def derive_status(approvals):
+    # COMPLETED hanya jika keempat approval sudah terisi
+    return "COMPLETED" if all(approvals) else "INPROGRESS"
+
+
+def approval_timestamps(approvals, previous=None, now=None):
+    # Waktu perubahan per approval: dicatat saat nilai diisi atau dikosongkan, selain itu tidak diubah
+    now = (now or datetime.now()).strftime(APPROVAL_TIMESTAMP_FORMAT)
+    stamps = {}
+    for col, at_col in zip(APPROVAL_COLUMNS, APPROVAL_AT_COLUMNS):
+        if previous is None:
+            stamps[at_col] = now if approvals[col] else ""
+        elif approvals[col] != previous[col]:
+            stamps[at_col] = now
+    return stamps
+
+
+def open_storage(backend=STORAGE_BACKEND, data_file=DATA_FILE, db_file=DB_FILE, parquet_dir=PARQUET_DIR):
+    from storage import ExcelStorage, ParquetStorage, SQLiteStorage, migrate_to_parquet, migrate_xlsx_to_sqlite
+
+    os.makedirs(os.path.dirname(db_file) or ".", exist_ok=True)
+    if backend == "excel":
+        return ExcelStorage(data_file, STORED_COLUMNS)
+    if backend == "parquet":
+        # Impor satu kali dari database/workbook yang sudah ada
+        migrate = not os.path.exists(parquet_dir)
+        storage = ParquetStorage(parquet_dir, STORED_COLUMNS)
+        if migrate and os.path.exists(db_file):
+            migrate_to_parquet(SQLiteStorage(db_file, STORED_COLUMNS), parquet_dir, STORED_COLUMNS)
+        elif migrate and os.path.exists(data_file):
+            migrate_to_parquet(ExcelStorage(data_file, STORED_COLUMNS), parquet_dir, STORED_COLUMNS)
+        return storage
+    # Migrasi satu kali dari workbook lama jika database belum ada
+    migrate = not os.path.exists(db_file) and os.path.exists(data_file)
+    storage = SQLiteStorage(db_file, STORED_COLUMNS)
+    if migrate:
+        migrate_xlsx_to_sqlite(data_file, db_file, STORED_COLUMNS)
+    return storage
+
+
+def program_no_key(value):
+    # Program No dibandingkan sebagai teks ("123", 123 dan 123.0 dianggap sama)
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ""
+        if value.is_integer():
+            value = int(value)
+    elif not isinstance(value, (str, int)):
+        import pandas as pd
+
+        if pd.isna(value):
+            return ""
+    return str(value).strip()
+
+
+def program_no_set(values):
+    return set(map(program_no_key, values)) - {""}
+
+
+class KeyIndexVersion:
+    # Indeks kunci untuk satu versi data: No -> posisi baris di tabel, Program No -> No.
+    # Tidak pernah diubah setelah dibuat; sesi memegang versi ini selama satu rerun bersama tabelnya
+
+    def __init__(self, signature, positions, program_nos, max_no):
+        self.signature = signature
+        self.positions = positions
+        self.program_nos = program_nos
+        self.max_no = max_no
+
+    @classmethod
+    def build(cls, signature, df):
+        nos = [int(no) for no in df[KEY_COLUMN].tolist()]
+        program_nos = {}
+        for no, program_no in zip(nos, map(program_no_key, df["Program No"].tolist())):
+            if program_no:
+                program_nos.setdefault(program_no, no)
+        return cls(signature, dict(zip(nos, range(len(nos)))), program_nos, max(nos, default=0))
+
+    def position(self, no):
+        return self.positions.get(int(no))
+
+    def find_program_no(self, program_no):
+        # No pemilik Program No ini, atau None jika belum dipakai
+        key = program_no_key(program_no)
+        return self.program_nos.get(key) if key else None
+
+    def with_change(self, signature, old_row=None, new_row=None):
+        # Versi baru (salinan) setelah satu insert/update; baris baru (No = max + 1) berada di akhir tabel hasil load
+        positions = dict(self.positions)
+        program_nos = dict(self.program_nos)
+        max_no = self.max_no
+        if old_row is not None:
+            old_key = program_no_key(old_row.get("Program No"))
+            if old_key and program_nos.get(old_key) == int(old_row[KEY_COLUMN]):
+                del program_nos[old_key]
+        no = int(new_row[KEY_COLUMN])
+        if no not in positions:
+            positions[no] = len(positions)
+            max_no = max(max_no, no)
+        new_key = program_no_key(new_row.get("Program No"))
+        if new_key:
+            program_nos.setdefault(new_key, no)
+        return KeyIndexVersion(signature, positions, program_nos, max_no)
+
+
+class KeyIndex:
+    # Indeks kunci per proses: menyimpan versi terbaru dan membagikannya ke sesi lewat sync().
+    # Lookup dan cek duplikat O(1); versi baru dibuat inkremental oleh handler insert/update,
+    # atau dibangun ulang jika tidak sinkron dengan versi data (delete menggeser posisi baris).
+    # Versi lama tidak pernah diubah, jadi sesi yang masih memegang tabel lama tetap konsisten
+
+    def __init__(self):
+        self.latest = None
+        self._lock = threading.Lock()
+
+    def sync(self, signature, df):
+        # Indeks untuk tabel df (versi signature); signature None (gagal baca) tidak disimpan bersama
+        if signature is None:
+            return KeyIndexVersion.build(None, df)
+        with self._lock:
+            if self.latest is not None and self.latest.signature == signature:
+                return self.latest
+        version = KeyIndexVersion.build(signature, df)
+        with self._lock:
+            self.latest = version
+        return version
+
+    def invalidate(self):
+        with self._lock:
+            self.latest = None
+
+    def apply_change(self, before_signature, after_signature, old_row=None, new_row=None):
+        # before/after: Change dari storage (diambil di dalam kunci tulis). Versi baru dibuat hanya jika
+        # penulisan ini langsung menyusul versi terbaru; selain itu dibangun ulang pada sync berikutnya
+        with self._lock:
+            if self.latest is None or self.latest.signature != before_signature or new_row is None:
+                self.latest = None
+                return
+            self.latest = self.latest.with_change(after_signature, old_row, new_row)
+
+
+def parse_dates(raw):
+    import pandas as pd
+
+    # Satu parse batch; hanya nilai yang gagal dicoba ulang dengan format campuran
+    parsed = pd.to_datetime(raw, errors="coerce")
+    retry = parsed.isna() & raw.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(raw[retry], errors="coerce", format="mixed")
+    return parsed
+
+
+def validate_upload(df_uploaded, existing_program_nos, seen_program_nos=None):
+    import numpy as np
+
+    # Validasi kolom-per-kolom; hasilnya sama dengan pengecekan per baris (urut per baris)
+    # seen_program_nos: Program No dari potongan sebelumnya (mode streaming), diperbarui di sini
+    program_nos = df_uploaded["Program No"].map(program_no_key).astype(object)
+    has_program_no = program_nos != ""
+    if isinstance(existing_program_nos, set):
+        existing = existing_program_nos
+    else:
+        existing = program_no_set(existing_program_nos)
+    already_exists = has_program_no & program_nos.isin(existing)
+    duplicated = has_program_no & program_nos.duplicated(keep="first")
+    if seen_program_nos is not None:
+        duplicated |= has_program_no & program_nos.isin(seen_program_nos)
+        seen_program_nos.update(program_nos[has_program_no])
+
+    creation_raw, due_raw = df_uploaded["Creation Date"], df_uploaded["Due Date"]
+    creation_dates = parse_dates(creation_raw)
+    due_dates = parse_dates(due_raw)
+    bad_format = (creation_dates.isna() & creation_raw.notna()) | (due_dates.isna() & due_raw.notna())
+    missing_date = ~bad_format & (creation_dates.isna() | due_dates.isna())
+    due_before_creation = ~bad_format & ~missing_date & (due_dates < creation_dates)
+
+    checks = [
+        (df_uploaded["Well Name"].isna(), "Well Name harus diisi"),
+        (already_exists, "Program No " + program_nos + " sudah ada"),
+        (duplicated, "Program No " + program_nos + " duplikat di dalam file"),
+        (~df_uploaded["Status"].isin(VALID_STATUSES), f"Status harus {VALID_STATUSES}"),
+        (~df_uploaded["Doc Initiator"].isin(VALID_INITIATORS), f"Doc Initiator harus {VALID_INITIATORS}"),
+        (~df_uploaded["Approval 1"].isin(VALID_APPROVAL1_2), f"Approval 1 harus {VALID_APPROVAL1_2}"),
+        (~df_uploaded["Approval 2"].isin(VALID_APPROVAL1_2), f"Approval 2 harus {VALID_APPROVAL1_2}"),
+        (~df_uploaded["Approval 3"].isin(VALID_APPROVAL3), f"Approval 3 harus {VALID_APPROVAL3}"),
+        (~df_uploaded["Approval 4"].isin(VALID_APPROVAL4), f"Approval 4 harus {VALID_APPROVAL4}"),
+        (missing_date, "Creation Date atau Due Date tidak valid"),
+        (due_before_creation, "Due Date tidak boleh sebelum Creation Date"),
+        (bad_format, "Format Creation Date atau Due Date tidak valid"),
+    ]
+
+    positions, orders, messages = [], [], []
+    for order, (mask, message) in enumerate(checks):
+        failed = np.flatnonzero(np.asarray(mask, dtype=bool))
+        if failed.size == 0:
+            continue
+        positions.append(failed)
+        orders.append(np.full(failed.size, order))
+        if isinstance(message, str):
+            messages.append(np.full(failed.size, message, dtype=object))
+        else:
+            messages.append(message.to_numpy(dtype=object)[failed])
+    if not positions:
+        return []
+
+    positions = np.concatenate(positions)
+    orders = np.concatenate(orders)
+    messages = np.concatenate(messages)
+    ordering = np.lexsort((orders, positions))
+    labels = df_uploaded.index.to_numpy()[positions[ordering]] + 2
+    return [f"Baris {label}: {message}" for label, message in zip(labels, messages[ordering])]
+
+
+def format_for_display(df):
+    # Kolom tanggal (datetime64) diformat menjadi teks hanya untuk tampilan
+    df = df.copy()
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].dt.strftime(DISPLAY_DATE_FORMAT).fillna("")
+    return df
+
+
+def build_reminder_table(df, today, approaching_days=REMINDER_APPROACHING_DAYS):
+    import numpy as np
+    import pandas as pd
+
+    # Satu baris per approval yang masih kosong, dengan status pengingat berdasarkan Due Date
+    if df.empty:
+        return pd.DataFrame(columns=REMINDER_COLUMNS)
+    due_dates = df["Due Date"]
+    delta_days = (due_dates - pd.Timestamp(today)).dt.days
+    reminder_status = np.select(
+        [due_dates.isna(), delta_days < 0, delta_days <= approaching_days],
+        ["Invalid Due Date", "Overdue", "Approaching Due Date"],
+        default="On Track"
+    )
+    id_columns = [col for col in REMINDER_COLUMNS if col not in ("Approver", "Reminder Status")]
+    base = df[id_columns + APPROVAL_COLUMNS].assign(**{"Reminder Status": reminder_status, "_row": np.arange(len(df))})
+    unapproved = base.melt(
+        id_vars=id_columns + ["Reminder Status", "_row"],
+        value_vars=APPROVAL_COLUMNS,
+        var_name="Approver",
+        value_name="_approval"
+    )
+    unapproved = unapproved[unapproved["_approval"] == ""]
+    # Urutan sama seperti sebelumnya: per baris data, lalu Approval 1..4
+    unapproved = unapproved.sort_values("_row", kind="stable")
+    return unapproved[REMINDER_COLUMNS].reset_index(drop=True)
+
+
+def build_filter_masks(df):
+    # Mask boolean per (kolom, opsi filter), dihitung sekali per versi data
+    masks = {}
+    for status in VALID_STATUSES:
+        masks[("Status", status)] = (df["Status"] == status).to_numpy()
+    for col in APPROVAL_COLUMNS:
+        masks[(col, UNAPPROVED)] = (df[col] == "").to_numpy()
+        masks[(col, APPROVED)] = df[col].isin(APPROVED_VALUES[col]).to_numpy()
+    return masks
+
+
+def combine_filter_masks(masks, filters, length):
+    import numpy as np
+
+    mask = np.ones(length, dtype=bool)
+    for col, option in filters.items():
+        if option != FILTER_ALL:
+            mask &= masks[(col, option)]
+    return mask
+
+
+def sort_positions(df, column):
+    import pandas as pd
+
+    # Posisi baris terurut menurut kolom (stabil, nilai kosong di akhir)
+    values = df[column].reset_index(drop=True)
+    if not isinstance(values.dtype, pd.CategoricalDtype) and not pd.api.types.is_numeric_dtype(values) \
+            and not pd.api.types.is_datetime64_any_dtype(values):
+        values = values.astype(str)
+    return values.sort_values(kind="stable", na_position="last").index.to_numpy()
+
+
+def page_positions(order, mask, ascending, page_size, page_number):
+    # Hanya posisi untuk halaman yang diminta; tidak ada salinan tabel yang difilter
+    selected = order[mask[order]]
+    if not ascending:
+        selected = selected[::-1]
+    start = (page_number - 1) * page_size
+    return selected[start:start + page_size]